@@ -1,11 +1,14 @@
 import streamlit as st
 import os
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 import chat
 
 try:
     import ghi_mamdani
     import ghi_sugeno
+    import plot_map
+    from modelo_fuzzy import carregar_modelo, MODELOS_DIR, LIMITES
 except ImportError as e:
     st.error(f"Erro ao importar modelos fuzzy: {e}. Verifique se os arquivos estão na pasta raiz.")
     st.stop()
@@ -32,6 +35,40 @@ def plot_variable(variable, input_val=None, title=""):
     ax.set_title(title)
     return fig
 
+# Rótulos das entradas para a superfície de controle
+NOMES_ENTRADAS = {
+    'hora_cos': "Hora Cosseno (Elevação)",
+    'hora_sin': "Hora Seno (Dia/Tarde)",
+    'tipo_nuvem': "Cobertura de Nuvens",
+    'temp_ar': "Temperatura (°C)",
+}
+RESOLUCAO_GROSSA = 12
+RESOLUCAO_FINA = 50
+CACHE_SUPERFICIES = 256
+# Estados lembrados por sessão (LRU): cada um ocupa 4 entradas do cache
+# (2 modelos x 2 resoluções), então além disso a malha fina já saiu do cache
+ESTADOS_LEMBRADOS = CACHE_SUPERFICIES // 4
+
+@st.cache_resource
+def modelo_compilado(nome):
+    """Modelo compilado (modelo_fuzzy), carregado uma vez por processo."""
+    return carregar_modelo(f'{MODELOS_DIR}/{nome}')
+
+@st.cache_data(max_entries=CACHE_SUPERFICIES)
+def superficie(nome_modelo, x_nome, y_nome, fixos, resolucao):
+    """Malha (X, Y, Z) por estado dos sliders; `fixos` é uma tupla de pares."""
+    return plot_map.grade_superficie(
+        modelo_compilado(nome_modelo), x_nome, LIMITES[x_nome], y_nome, LIMITES[y_nome],
+        dict(fixos), resolucao
+    )
+
+def desenhar_superficies(espacos, x_nome, y_nome, fixos, resolucao):
+    for espaco, (nome, rotulo) in zip(espacos, [('mamdani', 'Mamdani'), ('sugeno', 'Sugeno')]):
+        X, Y, Z = superficie(nome, x_nome, y_nome, fixos, resolucao)
+        fig = plot_map.figura_superficie(X, Y, Z, x_nome, y_nome, rotulo, figsize=(7, 5))
+        espaco.pyplot(fig, clear_figure=True)
+        plt.close(fig)
+
 # --- TÍTULO ---
 st.title("☀️ Sistema Fuzzy de Irradiação Solar RN")
 st.markdown("Comparativo de Lógica Fuzzy (Mamdani vs Sugeno vs Machine Learning) e Assistente de IA.")
@@ -73,22 +110,24 @@ with tab_chat:
         submit_button = st.form_submit_button("Enviar")
 
     if submit_button and user_prompt:
-        with st.spinner("Analisando sua pergunta e buscando gráficos..."):
-            try:
-                api_text, api_images = chat.run_ai(user_prompt)
-                
-                st.session_state.chat_history.append({
-                    "question": user_prompt,
-                    "answer": api_text,
-                    "images": api_images
-                })
-            except Exception as e:
-                error_message = f"Ocorreu um erro ao processar sua pergunta: {e}"
-                st.session_state.chat_history.append({
-                    "question": user_prompt,
-                    "answer": error_message,
-                    "images": []
-                })
+        # Resposta exibida em streaming; a chamada ao LLM roda no laço de
+        # fundo do chat.py, com timeout e limite de concorrência
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(user_prompt)
+            with st.chat_message("model"):
+                try:
+                    api_text = st.write_stream(chat.stream_ai(user_prompt))
+                    api_images = [] if api_text.startswith("Erro") else chat.find_images_in_response(api_text)
+                except Exception as e:
+                    api_text = f"Ocorreu um erro ao processar sua pergunta: {e}"
+                    api_images = []
+
+        st.session_state.chat_history.append({
+            "question": user_prompt,
+            "answer": api_text,
+            "images": api_images
+        })
         st.rerun()
 
 
@@ -152,4 +191,37 @@ with tab_manual:
         if abs(diff) > 100:
             st.warning("Alta divergência entre modelos!")
         else:
-            st.caption("Modelos concordantes.")
\ No newline at end of file
+            st.caption("Modelos concordantes.")
+
+    st.markdown("---")
+
+    # --- 4. Superfície de Controle ---
+    st.markdown("### 3. Superfície de Controle")
+    st.caption("As duas entradas escolhidas variam em toda a faixa; as demais ficam nos valores dos sliders acima.")
+
+    col_eixo1, col_eixo2 = st.columns(2)
+    with col_eixo1:
+        x_nome = st.selectbox("Eixo X", list(NOMES_ENTRADAS), index=2, format_func=NOMES_ENTRADAS.get)
+    with col_eixo2:
+        opcoes_y = [v for v in NOMES_ENTRADAS if v != x_nome]
+        y_nome = st.selectbox("Eixo Y", opcoes_y, index=opcoes_y.index('hora_cos') if 'hora_cos' in opcoes_y else 0,
+                              format_func=NOMES_ENTRADAS.get)
+
+    valores = {'hora_sin': h_sin, 'hora_cos': h_cos, 'tipo_nuvem': nuvem, 'temp_ar': temp}
+    fixos = tuple((v, valores[v]) for v in NOMES_ENTRADAS if v not in (x_nome, y_nome))
+
+    col_sup1, col_sup2 = st.columns(2)
+    espacos = [col_sup1.empty(), col_sup2.empty()]
+
+    # Refinamento progressivo: malha grossa imediata, depois a fina. Estados
+    # já calculados (cache por valores dos sliders) vão direto para a fina.
+    chave = (x_nome, y_nome, fixos)
+    prontas = st.session_state.setdefault('superficies_prontas', OrderedDict())
+    if chave in prontas:
+        prontas.move_to_end(chave)
+    else:
+        desenhar_superficies(espacos, x_nome, y_nome, fixos, RESOLUCAO_GROSSA)
+    desenhar_superficies(espacos, x_nome, y_nome, fixos, RESOLUCAO_FINA)
+    prontas[chave] = True
+    while len(prontas) > ESTADOS_LEMBRADOS:
+        prontas.popitem(last=False)
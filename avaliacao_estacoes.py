@@ -0,0 +1,213 @@
+"""
+Avaliação completa por estação (INMET) dos sistemas fuzzy e do XGBoost.
+
+Ao contrário de evaluate-fuzzy.py, que descarta timestamps duplicados para
+montar uma amostra de gráficos, aqui cada estação é um shard independente,
+processado em um worker próprio. As predições são gravadas em parquet
+particionado no estilo Hive (estacao=.../ano=...) e as métricas por estação
+são agregadas ao final.
+"""
+
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from modelo_fuzzy import carregar_modelo, MODELOS_DIR, ENTRADAS
+from modelo_xgb import xgb_disponivel, carregar_xgb, carregar_features
+from dados_compartilhados import BufferCompartilhado, publicar_colunas
+from metricas import mae_rmse_r2, LIMIAR_DIURNO
+
+X_TEST_PATH = 'data/X_test.parquet'
+Y_TEST_PATH = 'data/y_test.parquet'
+
+OUTPUT_DIR = 'predict'
+DESTINO_PARTICIONADO = f'{OUTPUT_DIR}/resultados_estacoes'
+METRICAS_PATH = f'{OUTPUT_DIR}/metricas_estacoes.csv'
+
+# Não há código de estação nos dados: a estação é identificada pelas coordenadas
+COLUNAS_ESTACAO = ['latitude_inmet', 'longitude_inmet']
+
+
+# ======================================================
+# 1. PARTICIONAMENTO
+# ======================================================
+
+def identificar_estacoes(X):
+    """Retorna um identificador textual de estação ('lat_lon') por linha."""
+    lat = X[COLUNAS_ESTACAO[0]].round(4).map('{:.4f}'.format)
+    lon = X[COLUNAS_ESTACAO[1]].round(4).map('{:.4f}'.format)
+    return lat + '_' + lon
+
+
+def particionar_por_estacao(X):
+    """
+    Ordena as linhas por estação (preservando timestamps repetidos) e retorna
+    a permutação e os intervalos contíguos [inicio, fim) de cada shard.
+    """
+    estacoes = identificar_estacoes(X).to_numpy()
+    ordem = np.argsort(estacoes, kind='stable')
+    nomes, inicios, contagens = np.unique(estacoes[ordem], return_index=True, return_counts=True)
+    shards = [(e, int(i), int(i + c)) for e, i, c in zip(nomes, inicios, contagens)]
+    return ordem, shards
+
+
+# ======================================================
+# 2. WORKER
+# ======================================================
+
+MODELOS = ['XGBoost', 'Mamdani', 'Sugeno']
+
+
+def _pontuar_intervalo(entradas, features, saida, usar_xgb):
+    if usar_xgb:
+        model_ghi, nomes = carregar_xgb()
+        saida[:, 0] = model_ghi.predict(pd.DataFrame(features, columns=nomes))
+
+    colunas = entradas.T
+    saida[:, 1] = carregar_modelo(f'{MODELOS_DIR}/mamdani').avaliar_lote(*colunas)
+    saida[:, 2] = carregar_modelo(f'{MODELOS_DIR}/sugeno').avaliar_lote(*colunas)
+
+
+def pontuar_estacao(desc_entradas, desc_features, desc_saida, inicio, fim, usar_xgb=True):
+    """
+    Executa Mamdani, Sugeno e (se disponível) XGBoost sobre uma estação.
+    Roda em processo separado: o worker anexa-se às fatias [inicio, fim) dos
+    buffers compartilhados, carrega os modelos compilados (modelo_fuzzy.py) e
+    escreve as predições direto no buffer de saída.
+    """
+    buffers = [BufferCompartilhado.anexar(d) for d in (desc_entradas, desc_features, desc_saida)]
+    try:
+        entradas, features, saida = (b.array[inicio:fim] for b in buffers)
+        _pontuar_intervalo(entradas, features, saida, usar_xgb)
+        del entradas, features, saida
+    finally:
+        for b in buffers:
+            b.fechar()
+    return fim - inicio
+
+
+def pontuar_em_paralelo(x_path, ordem, shards, workers=None, usar_xgb=True):
+    """
+    Publica entradas e features em memória compartilhada, distribui os shards
+    entre processos e devolve as predições (N x 3, na ordem de `ordem`).
+    """
+    nomes_features = carregar_features()
+    entradas = publicar_colunas(x_path, ENTRADAS, ordem=ordem)
+    features = publicar_colunas(x_path, nomes_features, ordem=ordem)
+    saida = BufferCompartilhado.criar((len(ordem), len(MODELOS)))
+    saida.array[:, 0] = np.nan
+    descritores = (entradas.descritor, features.descritor, saida.descritor)
+    try:
+        if workers == 1:
+            for _, inicio, fim in shards:
+                pontuar_estacao(*descritores, inicio, fim, usar_xgb)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futuros = [pool.submit(pontuar_estacao, *descritores, inicio, fim, usar_xgb)
+                           for _, inicio, fim in shards]
+                for f in futuros:
+                    f.result()
+        return saida.array.copy()
+    finally:
+        for b in (entradas, features, saida):
+            b.fechar()
+
+
+def montar_resultados(X, y, ordem, shards, predicoes, usar_xgb=True):
+    """Reúne metadados (timestamp, estação, ano, GHI real) e predições."""
+    df = pd.DataFrame(index=X.index[ordem])
+    df['estacao'] = np.repeat([e for e, _, _ in shards], [fim - inicio for _, inicio, fim in shards])
+    df['ano'] = df.index.year.astype(np.int32)
+    df['GHI_Real'] = y['ghi'].to_numpy()[ordem]
+    for j, modelo in enumerate(MODELOS):
+        if modelo != 'XGBoost' or usar_xgb:
+            df[modelo] = predicoes[:, j]
+    return df
+
+
+# ======================================================
+# 3. SAÍDA PARTICIONADA
+# ======================================================
+
+def gravar_particionado(df, destino=DESTINO_PARTICIONADO):
+    """Grava as predições em parquet Hive (estacao=.../ano=...)."""
+    tabela = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    pq.write_to_dataset(
+        tabela,
+        root_path=destino,
+        partition_cols=['estacao', 'ano'],
+        existing_data_behavior='delete_matching',
+    )
+    return destino
+
+
+# ======================================================
+# 4. MÉTRICAS
+# ======================================================
+
+def metricas_por_estacao(df):
+    """
+    Calcula MAE/RMSE/R² (apenas diurno) por estação e modelo, mais uma linha
+    agregada 'TODAS' com todas as estações juntas.
+    """
+    modelos = [m for m in MODELOS if m in df.columns]
+    df_diurno = df[df['GHI_Real'] > LIMIAR_DIURNO]
+
+    linhas = []
+    grupos = list(df_diurno.groupby('estacao')) + [('TODAS', df_diurno)]
+    for estacao, grupo in grupos:
+        for modelo in modelos:
+            linha = {'estacao': estacao, 'modelo': modelo}
+            linha.update(zip(['MAE', 'RMSE', 'R2'], mae_rmse_r2(grupo['GHI_Real'], grupo[modelo])))
+            linha['N'] = len(grupo)
+            linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+# ======================================================
+# 5. EXECUÇÃO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação fuzzy/ML particionada por estação.")
+    parser.add_argument('--workers', type=int, default=None, help="Número de processos (padrão: CPUs)")
+    parser.add_argument('--destino', default=DESTINO_PARTICIONADO, help="Diretório do dataset particionado")
+    parser.add_argument('--sem-xgb', action='store_true', help="Não executa o XGBoost")
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Apenas metadados via pandas; as colunas numéricas vão direto para
+    # memória compartilhada em pontuar_em_paralelo
+    X_test = pd.read_parquet(X_TEST_PATH, columns=COLUNAS_ESTACAO)
+    y_test = pd.read_parquet(Y_TEST_PATH, columns=['ghi'])
+    usar_xgb = not args.sem_xgb
+    if usar_xgb and not xgb_disponivel():
+        usar_xgb = False
+
+    ordem, shards = particionar_por_estacao(X_test)
+    print(f"Dados: {len(X_test)} amostras em {len(shards)} estações")
+
+    inicio = time.perf_counter()
+    predicoes = pontuar_em_paralelo(X_TEST_PATH, ordem, shards, workers=args.workers, usar_xgb=usar_xgb)
+    duracao = time.perf_counter() - inicio
+    df = montar_resultados(X_test, y_test, ordem, shards, predicoes, usar_xgb)
+    print(f"Pontuação concluída em {duracao:.1f}s ({len(df) / duracao:.0f} amostras/s)")
+
+    destino = gravar_particionado(df, args.destino)
+    print(f"Predições salvas em: {destino}")
+
+    metricas = metricas_por_estacao(df)
+    metricas.to_csv(METRICAS_PATH, index=False)
+    print(metricas.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"Métricas salvas em: {METRICAS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
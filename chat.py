@@ -1,7 +1,28 @@
+"""
+Backend do chatbot do projeto.
+
+As chamadas ao LLM rodam em um laço asyncio próprio, em uma thread de fundo
+reutilizada entre reruns do Streamlit, então o script não fica bloqueado:
+- um único cliente por backend (configurado uma vez);
+- concorrência limitada por semáforo;
+- timeout por requisição e novas tentativas com espera exponencial (só
+  enquanto nenhum texto foi entregue);
+- texto parcial entregue em streaming para a interface (st.write_stream).
+
+O backend é plugável: GeminiBackend para a API real e LocalBackend, que
+simula latência e vazão sem rede, para testes offline
+(`python chat.py --requisicoes 50 --concorrencia 8`).
+"""
+
 import google.generativeai as genai
 import streamlit as st
 import os
 import re
+import time
+import queue
+import asyncio
+import argparse
+import threading
 
 IMAGE_MAP = {
 
@@ -18,6 +39,13 @@ IMAGE_MAP = {
     ]
 }
 
+GEMINI_MODEL = 'gemini-2.5-flash'
+MAX_CONCURRENCY = 4
+REQUEST_TIMEOUT = 60.0   # segundos por requisição
+QUEUE_TIMEOUT = 30.0     # segundos esperando uma vaga de concorrência
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 1.0       # segundos; dobra a cada tentativa
+
 def load_context():
     """Carrega o arquivo de texto de contextualização."""
     try:
@@ -53,24 +81,9 @@ def find_images_in_response(response_text):
     # Retorna como lista para o Streamlit renderizar
     return list(images_to_show)
 
-def run_ai(user_prompt):
-    """
-    Executa a consulta à API do Gemini, combinando o contexto e o prompt do usuário.
-    Retorna o texto da resposta e uma lista de imagens para exibir.
-    """
-    context_text = load_context()
-    if not context_text:
-        return "Erro: Não foi possível carregar o contexto do projeto.", []
-
-    try:
-        api_key = st.secrets["GEMINI_API_KEY"]
-        genai.configure(api_key=api_key) # type: ignore
-    except KeyError:
-        return "Erro: A GEMINI_API_KEY não foi configurada nos Segredos (Secrets) do Streamlit.", []
-    except Exception as e:
-        return f"Erro ao configurar a API do Gemini: {e}", []
-
-    full_prompt = f"""
+def build_prompt(context_text, user_prompt):
+    """Monta o prompt completo a partir do contexto e da pergunta."""
+    return f"""
     {context_text}
     
     ---
@@ -85,14 +98,258 @@ def run_ai(user_prompt):
     como 'comparação', 'dispersão', 'barras', 'inputs', 'saída' ou 'mapeamento'
     em sua resposta para que a imagem correta possa ser exibida.
     """
-    
+
+# ==============================================================================
+# BACKENDS
+# ==============================================================================
+
+class GeminiBackend:
+    """Cliente Gemini configurado uma única vez e reutilizado entre perguntas."""
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL):
+        genai.configure(api_key=api_key) # type: ignore
+        self.model = genai.GenerativeModel(model_name) # type: ignore
+
+    async def stream(self, prompt, timeout):
+        """Gera a resposta em pedaços de texto."""
+        response = await self.model.generate_content_async(
+            prompt, stream=True, request_options={'timeout': timeout}
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+class LocalBackend:
+    """
+    Substituto local do LLM para testes de latência e vazão sem rede: espera
+    `first_token` segundos, depois entrega a resposta palavra a palavra a
+    cada `interval` segundos. `fail_rate` simula falhas transitórias.
+    """
+
+    def __init__(self, first_token=0.5, interval=0.02, answer=None, fail_rate=0.0, seed=0):
+        import random
+        self.first_token = first_token
+        self.interval = interval
+        self.answer = answer or (
+            "Resposta simulada: o Mamdani usa defuzzificação por centroide e o Sugeno "
+            "uma média ponderada; veja o gráfico de barras e a dispersão das predições."
+        )
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+
+    async def stream(self, prompt, timeout):
+        await asyncio.sleep(self.first_token)
+        if self._random.random() < self.fail_rate:
+            raise ConnectionError("falha simulada do backend local")
+        for word in self.answer.split(' '):
+            yield word + ' '
+            await asyncio.sleep(self.interval)
+
+# ==============================================================================
+# CLIENTE ASSÍNCRONO
+# ==============================================================================
+
+class BusyError(TimeoutError):
+    """Nenhuma vaga de concorrência foi liberada dentro de queue_timeout."""
+
+class AsyncChat:
+    """
+    Limita a concorrência (com prazo para conseguir uma vaga), aplica timeout
+    por requisição e refaz tentativas que falham antes de qualquer texto ter
+    sido entregue.
+    """
+
+    def __init__(self, backend, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE, queue_timeout=QUEUE_TIMEOUT):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._semaphore = None  # criado no laço em que for usado
+
+    async def stream(self, prompt):
+        """Gera o texto da resposta em pedaços, à medida que chega."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # O prazo da requisição só começa com a vaga; a espera na fila tem o seu
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise BusyError(f"nenhuma vaga livre em {self.queue_timeout:g}s") from None
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                delivered = False
+                pieces = self.backend.stream(prompt, self.timeout)
+                # Prazo fixo para a tentativa, contado a partir daqui: o tempo
+                # que o consumidor leva com cada pedaço também conta
+                deadline = asyncio.get_running_loop().time() + self.timeout
+                try:
+                    while True:
+                        remaining = deadline - asyncio.get_running_loop().time()
+                        if remaining <= 0:
+                            raise TimeoutError
+                        try:
+                            piece = await asyncio.wait_for(anext(pieces), remaining)
+                        except StopAsyncIteration:
+                            return
+                        delivered = True
+                        yield piece
+                except Exception:
+                    # Depois de entregar texto parcial não dá para recomeçar
+                    if delivered or attempt == self.max_attempts:
+                        raise
+                finally:
+                    await pieces.aclose()
+                await asyncio.sleep(self.backoff_base * 2 ** (attempt - 1))
+        finally:
+            self._semaphore.release()
+
+    async def ask(self, prompt):
+        """Resposta completa (sem streaming)."""
+        return ''.join([piece async for piece in self.stream(prompt)])
+
+class BackgroundLoop:
+    """Laço asyncio em uma thread de fundo, compartilhado entre reruns."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        """Executa uma corrotina no laço e espera o resultado."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def iterate(self, async_generator):
+        """
+        Consome um gerador assíncrono do laço como um gerador comum. Se o
+        consumidor parar antes do fim (rerun do Streamlit, gerador
+        descartado), a tarefa no laço é cancelada e libera a vaga do semáforo.
+        """
+        pieces = queue.Queue()
+        end = object()
+
+        async def pump():
+            try:
+                async for piece in async_generator:
+                    pieces.put(piece)
+            except Exception as e:
+                pieces.put(e)
+            finally:
+                pieces.put(end)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while (piece := pieces.get()) is not end:
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+        finally:
+            future.cancel()
+
+@st.cache_resource
+def get_background_loop():
+    return BackgroundLoop()
+
+@st.cache_resource
+def get_chat(backend_name):
+    """AsyncChat reutilizado entre sessões ('gemini' ou 'local')."""
+    if backend_name == 'local':
+        return AsyncChat(LocalBackend())
+    return AsyncChat(GeminiBackend(st.secrets["GEMINI_API_KEY"]))
+
+def selected_backend():
+    """Backend escolhido pela variável de ambiente CHAT_BACKEND (padrão: gemini)."""
+    return os.environ.get('CHAT_BACKEND', 'gemini')
+
+# ==============================================================================
+# INTERFACE
+# ==============================================================================
+
+def stream_ai(user_prompt):
+    """
+    Gerador de pedaços de texto da resposta, para uso com st.write_stream,
+    sem bloquear o laço de eventos. Erros de configuração e da API viram
+    mensagens de texto, como em run_ai.
+    """
+    context_text = load_context()
+    if not context_text:
+        yield "Erro: Não foi possível carregar o contexto do projeto."
+        return
+
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash') # type: ignore
-        response = model.generate_content(full_prompt)
-        response_text = response.text
+        chat = get_chat(selected_backend())
+    except KeyError:
+        yield "Erro: A GEMINI_API_KEY não foi configurada nos Segredos (Secrets) do Streamlit."
+        return
     except Exception as e:
-        return f"Erro ao gerar resposta da IA: {e}", []
+        yield f"Erro ao configurar a API do Gemini: {e}"
+        return
 
-    images = find_images_in_response(response_text)
-    
-    return response_text, images
\ No newline at end of file
+    try:
+        yield from get_background_loop().iterate(chat.stream(build_prompt(context_text, user_prompt)))
+    except BusyError:
+        yield "\n\nErro: muitas perguntas simultâneas; tente novamente em instantes."
+    except TimeoutError:
+        yield f"\n\nErro: a IA não respondeu em {chat.timeout:.0f}s."
+    except Exception as e:
+        yield f"\n\nErro ao gerar resposta da IA: {e}"
+
+def run_ai(user_prompt):
+    """
+    Executa a consulta à API do Gemini, combinando o contexto e o prompt do usuário.
+    Retorna o texto da resposta e uma lista de imagens para exibir.
+    """
+    response_text = ''.join(stream_ai(user_prompt))
+    if response_text.startswith("Erro"):
+        return response_text, []
+    return response_text, find_images_in_response(response_text)
+
+# ==============================================================================
+# TESTE OFFLINE DE LATÊNCIA E VAZÃO
+# ==============================================================================
+
+async def _benchmark(chat, n_requests):
+    """Dispara n_requests perguntas simultâneas; mede 1º pedaço e tempo total."""
+    async def one(i):
+        start = time.perf_counter()
+        first = None
+        async for _ in chat.stream(f"pergunta {i}"):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(n_requests)), return_exceptions=True)
+    return results, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste offline do backend do chat (LocalBackend).")
+    parser.add_argument('--requisicoes', type=int, default=20)
+    parser.add_argument('--concorrencia', type=int, default=MAX_CONCURRENCY)
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument('--timeout-fila', type=float, default=QUEUE_TIMEOUT,
+                        help="Espera máxima por uma vaga de concorrência (s)")
+    parser.add_argument('--primeiro-token', type=float, default=0.5, help="Latência simulada (s)")
+    parser.add_argument('--intervalo', type=float, default=0.02, help="Intervalo entre pedaços (s)")
+    parser.add_argument('--taxa-falha', type=float, default=0.0, help="Fração de falhas simuladas")
+    args = parser.parse_args()
+
+    import numpy as np
+    backend = LocalBackend(args.primeiro_token, args.intervalo, fail_rate=args.taxa_falha)
+    chat = AsyncChat(backend, max_concurrency=args.concorrencia, timeout=args.timeout,
+                     backoff_base=0.1, queue_timeout=args.timeout_fila)
+    results, total = asyncio.run(_benchmark(chat, args.requisicoes))
+
+    ok = [r for r in results if not isinstance(r, BaseException)]
+    print(f"{len(ok)}/{len(results)} respostas em {total:.2f}s ({len(ok) / total:.1f} respostas/s)")
+    if ok:
+        first, duration = np.array(ok).T
+        print(f"1º pedaço: p50 {np.median(first):.2f}s  p95 {np.percentile(first, 95):.2f}s")
+        print(f"Total:     p50 {np.median(duration):.2f}s  p95 {np.percentile(duration, 95):.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Camada de dados para pools de processos sem cópia por worker.
+
+As colunas de entrada (as 4 variáveis fuzzy e a matriz de features do
+XGBoost) são lidas do parquet via pyarrow direto para buffers NumPy
+contíguos. Esses buffers são publicados em `multiprocessing.shared_memory`
+(ou em arquivos .npy mapeados em memória) e os workers recebem apenas um
+descritor pequeno e picklável, anexando-se a fatias sem copiar os dados.
+O mesmo mecanismo serve para o array de saída onde os workers escrevem as
+predições.
+"""
+
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pyarrow.parquet as pq
+
+
+# ======================================================
+# 1. LEITURA (PARQUET -> NUMPY)
+# ======================================================
+
+def ler_colunas(caminho, colunas, ordem=None, dtype=np.float64, destino=None):
+    """
+    Lê `colunas` de um parquet para um array (N x C) C-contíguo.
+
+    `ordem` (opcional) reordena as linhas durante a cópia, de modo que cada
+    shard ocupe um intervalo contíguo. `destino` permite escrever direto em
+    um buffer já alocado (por exemplo, em memória compartilhada).
+    """
+    tabela = pq.read_table(caminho, columns=colunas)
+    if destino is None:
+        destino = np.empty((tabela.num_rows, len(colunas)), dtype=dtype)
+    for j, coluna in enumerate(colunas):
+        valores = tabela.column(coluna).to_numpy()
+        destino[:, j] = valores if ordem is None else valores[ordem]
+    return destino
+
+
+# ======================================================
+# 2. BUFFERS COMPARTILHADOS
+# ======================================================
+
+def _anexar_shm(nome):
+    # Workers apenas se anexam: o dono do segmento é quem faz unlink. Antes do
+    # Python 3.13 o registro no resource_tracker (compartilhado com o processo
+    # pai no pool) é idempotente, então não deve ser desfeito aqui.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, track=False)
+    return shared_memory.SharedMemory(name=nome)
+
+
+class BufferCompartilhado:
+    """
+    Array NumPy em memória compartilhada ('shm') ou em .npy mapeado ('npy').
+
+    O processo que cria o buffer é o dono e libera o segmento em `fechar()`.
+    Os workers usam `BufferCompartilhado.anexar(descritor)`; não devem manter
+    views de `array` depois de chamar `fechar()`.
+    """
+
+    def __init__(self, descritor, array, shm=None, dono=False):
+        self.descritor = descritor
+        self.array = array
+        self._shm = shm
+        self._dono = dono
+
+    @classmethod
+    def criar(cls, shape, dtype=np.float64, caminho_npy=None):
+        """Aloca um buffer zerado; com `caminho_npy` usa um .npy mapeado."""
+        dtype = np.dtype(dtype)
+        if caminho_npy is not None:
+            array = np.lib.format.open_memmap(caminho_npy, mode='w+', dtype=dtype, shape=shape)
+            descritor = ('npy', caminho_npy, tuple(shape), dtype.str)
+            return cls(descritor, array, dono=True)
+
+        tamanho = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=tamanho)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        array.fill(0)
+        descritor = ('shm', shm.name, tuple(shape), dtype.str)
+        return cls(descritor, array, shm=shm, dono=True)
+
+    @classmethod
+    def de_array(cls, origem, caminho_npy=None):
+        """Publica uma cópia de `origem`."""
+        buffer = cls.criar(origem.shape, origem.dtype, caminho_npy)
+        buffer.array[...] = origem
+        return buffer
+
+    @classmethod
+    def anexar(cls, descritor):
+        """Anexa-se a um buffer publicado por outro processo, sem cópia."""
+        tipo, nome, shape, dtype = descritor
+        if tipo == 'npy':
+            return cls(descritor, np.load(nome, mmap_mode='r+'))
+        shm = _anexar_shm(nome)
+        return cls(descritor, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), shm=shm)
+
+    def fechar(self):
+        """Solta a view; o dono também remove o segmento shm (o .npy é mantido)."""
+        if isinstance(self.array, np.memmap):
+            self.array.flush()
+        self.array = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._dono:
+                self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def publicar_colunas(caminho, colunas, ordem=None, dtype=np.float64, caminho_npy=None):
+    """Lê `colunas` do parquet direto para um buffer compartilhado."""
+    n_linhas = pq.read_metadata(caminho).num_rows
+    buffer = BufferCompartilhado.criar((n_linhas, len(colunas)), dtype, caminho_npy)
+    ler_colunas(caminho, colunas, ordem=ordem, destino=buffer.array)
+    return buffer
@@ -1,7 +1,8 @@
 import numpy as np
-import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from modelo_fuzzy import construir_mf
+
 # ======================================================
 # 1. DEFINIÇÃO DAS VARIÁVEIS
 # ======================================================
@@ -30,51 +31,68 @@ ghi = ctrl.Consequent(np.linspace(0, 1200, 1200), 'ghi', defuzzify_method='centr
 # 2. FUNÇÕES DE PERTINÊNCIA 
 # ======================================================
 
-# --- HORA_COS (Elevação) ---
-# Foco na região negativa (dia).
-# -1.0 = Zênite (Sol a pino)
-# -0.5 = 45 graus (Sol alto)
-#  0.0 = Horizonte
-# hora_cos['zenite']    = fuzz.trimf(hora_cos.universe, [-1.0, -1.0, -0.5])
-# hora_cos['alto']      = fuzz.trimf(hora_cos.universe, [-0.8, -0.4, 0.0])
-# hora_cos['baixo']     = fuzz.trimf(hora_cos.universe, [-0.3, 0.0, 0.3])
-# hora_cos['noite']     = fuzz.trapmf(hora_cos.universe, [0.1, 0.4, 1.0, 1.0])
-hora_cos['zenite']    = fuzz.gaussmf(hora_cos.universe, -1.0, 0.15) 
-hora_cos['alto']      = fuzz.gaussmf(hora_cos.universe, -0.5, 0.15)
-hora_cos['baixo']     = fuzz.gaussmf(hora_cos.universe, 0.0, 0.15)
-hora_cos['noite']     = fuzz.gaussmf(hora_cos.universe, 1.0, 0.2)
-
-# --- HORA_SIN (Manhã vs Tarde) ---
-# Manhã: > 0 | Tarde: < 0
-# hora_sin['tarde']     = fuzz.trapmf(hora_sin.universe, [-1.0, -1.0, -0.1, 0.0])
-# hora_sin['manha']     = fuzz.trapmf(hora_sin.universe, [0.0, 0.1, 1.0, 1.0])
-hora_sin['tarde']     = fuzz.gaussmf(hora_sin.universe, -1.0, 0.4)
-hora_sin['manha']     = fuzz.gaussmf(hora_sin.universe, 1.0, 0.4)
-
-# --- TIPO_NUVEM ---
-# Sobreposição generosa para suavizar transições de nuvens
-# tipo_nuvem['limpo']     = fuzz.trimf(tipo_nuvem.universe, [0, 0, 4])
-# tipo_nuvem['parcial']   = fuzz.trimf(tipo_nuvem.universe, [2, 5, 8])
-# tipo_nuvem['encoberto'] = fuzz.trapmf(tipo_nuvem.universe, [6, 9, 10, 10])
-tipo_nuvem['limpo']     = fuzz.gaussmf(tipo_nuvem.universe, 0.0, 1.5)
-tipo_nuvem['parcial']   = fuzz.gaussmf(tipo_nuvem.universe, 5.0, 2.0)
-tipo_nuvem['encoberto'] = fuzz.gaussmf(tipo_nuvem.universe, 10.0, 2.0)
-
-# --- TEMPERATURA ---
-# temp_ar['conforto'] = fuzz.trapmf(temp_ar.universe, [10, 10, 20, 28])
-# temp_ar['quente']   = fuzz.trapmf(temp_ar.universe, [25, 32, 45, 45])
-temp_ar['conforto'] = fuzz.gaussmf(temp_ar.universe, 20.0, 8.0)
-temp_ar['quente']   = fuzz.gaussmf(temp_ar.universe, 35.0, 8.0)
-
-
-# --- GHI OUTPUT ---
-ghi['zero']        = fuzz.trimf(ghi.universe, [0, 0, 10])
-ghi['muito_baixo'] = fuzz.trimf(ghi.universe, [10, 150, 300])
-ghi['baixo']       = fuzz.trimf(ghi.universe, [200, 350, 500])
-ghi['medio']       = fuzz.trimf(ghi.universe, [400, 550, 700])
-ghi['alto']        = fuzz.trimf(ghi.universe, [600, 750, 850])
-ghi['muito_alto']  = fuzz.trimf(ghi.universe, [850, 950, 1050]) 
-ghi['extremo']     = fuzz.trapmf(ghi.universe, [980, 1050, 1100, 1100])
+# Parâmetros declarados em tabela para que o modelo possa ser exportado
+# (ver modelo_fuzzy.py). Formato: termo -> (função skfuzzy, parâmetros)
+PERTINENCIAS = {
+    # --- HORA_COS (Elevação) ---
+    # Foco na região negativa (dia).
+    # -1.0 = Zênite (Sol a pino)
+    # -0.5 = 45 graus (Sol alto)
+    #  0.0 = Horizonte
+    # 'zenite': ('trimf', [-1.0, -1.0, -0.5]),
+    # 'alto':   ('trimf', [-0.8, -0.4, 0.0]),
+    # 'baixo':  ('trimf', [-0.3, 0.0, 0.3]),
+    # 'noite':  ('trapmf', [0.1, 0.4, 1.0, 1.0]),
+    'hora_cos': {
+        'zenite': ('gaussmf', [-1.0, 0.15]),
+        'alto':   ('gaussmf', [-0.5, 0.15]),
+        'baixo':  ('gaussmf', [0.0, 0.15]),
+        'noite':  ('gaussmf', [1.0, 0.2]),
+    },
+
+    # --- HORA_SIN (Manhã vs Tarde) ---
+    # Manhã: > 0 | Tarde: < 0
+    # 'tarde': ('trapmf', [-1.0, -1.0, -0.1, 0.0]),
+    # 'manha': ('trapmf', [0.0, 0.1, 1.0, 1.0]),
+    'hora_sin': {
+        'tarde': ('gaussmf', [-1.0, 0.4]),
+        'manha': ('gaussmf', [1.0, 0.4]),
+    },
+
+    # --- TIPO_NUVEM ---
+    # Sobreposição generosa para suavizar transições de nuvens
+    # 'limpo':     ('trimf', [0, 0, 4]),
+    # 'parcial':   ('trimf', [2, 5, 8]),
+    # 'encoberto': ('trapmf', [6, 9, 10, 10]),
+    'tipo_nuvem': {
+        'limpo':     ('gaussmf', [0.0, 1.5]),
+        'parcial':   ('gaussmf', [5.0, 2.0]),
+        'encoberto': ('gaussmf', [10.0, 2.0]),
+    },
+
+    # --- TEMPERATURA ---
+    # 'conforto': ('trapmf', [10, 10, 20, 28]),
+    # 'quente':   ('trapmf', [25, 32, 45, 45]),
+    'temp_ar': {
+        'conforto': ('gaussmf', [20.0, 8.0]),
+        'quente':   ('gaussmf', [35.0, 8.0]),
+    },
+
+    # --- GHI OUTPUT ---
+    'ghi': {
+        'zero':        ('trimf', [0, 0, 10]),
+        'muito_baixo': ('trimf', [10, 150, 300]),
+        'baixo':       ('trimf', [200, 350, 500]),
+        'medio':       ('trimf', [400, 550, 700]),
+        'alto':        ('trimf', [600, 750, 850]),
+        'muito_alto':  ('trimf', [850, 950, 1050]),
+        'extremo':     ('trapmf', [980, 1050, 1100, 1100]),
+    },
+}
+
+for _var in (hora_cos, hora_sin, tipo_nuvem, temp_ar, ghi):
+    for _termo, (_funcao, _params) in PERTINENCIAS[_var.label].items():
+        _var[_termo] = construir_mf(_var.universe, _funcao, _params)
 
 
 # ======================================================
@@ -133,7 +151,8 @@ simulador = ctrl.ControlSystemSimulation(controle_ghi)
 # 4. INTERFACE
 # ======================================================
 
-def avaliar_ghi_mamdani(h_sin, h_cos, nuvem, temp):
+def avaliar_ghi_mamdani(h_sin, h_cos, nuvem, temp, simulador=simulador):
+    """`simulador`: outra ControlSystemSimulation de controle_ghi (ex.: cache=False)."""
     try:
         # Clipping rigoroso para evitar erros de limite
         simulador.input['hora_sin'] = np.clip(h_sin, -1, 1)
@@ -87,71 +87,98 @@ PESOS = {
 # FUNÇÕES DE ATIVAÇÃO
 # ======================================================
 
-def gaussian(x, mean, sigma):
-    return np.exp(-0.5 * ((x - mean) / sigma) ** 2)
-
-def calcular_ativacao(h_sin, h_cos, nuvem, temp):
+# Pertinências gaussianas: nome -> (entrada, média, desvio)
+PERTINENCIAS = {
     # 1. Pertinências de HORA
-    p_meio_dia    = gaussian(h_cos, -1.0, 0.3)
-    p_manha_tarde = gaussian(h_cos, -0.5, 0.3)
-    p_horizonte   = gaussian(h_cos, 0.0, 0.2)
-    
-    # 2. Pertinências de PERÍODO (Seno)
-    p_periodo_manha = gaussian(h_sin, 0.7, 0.5)
-    p_periodo_tarde = gaussian(h_sin, -0.7, 0.5)
+    "meio_dia":    ("hora_cos", -1.0, 0.3),
+    "manha_tarde": ("hora_cos", -0.5, 0.3),
+    "horizonte":   ("hora_cos", 0.0, 0.2),
 
-    # 3. Noite
-    p_noite = 1.0 if h_cos > 0.2 else 0.0
-    if h_cos > 0.1:
-        p_horizonte *= (1 - (h_cos - 0.1)*10)
-        p_horizonte = max(0, p_horizonte)
+    # 2. Pertinências de PERÍODO (Seno)
+    "manha": ("hora_sin", 0.7, 0.5),
+    "tarde": ("hora_sin", -0.7, 0.5),
 
     # 4. Pertinências de NUVEM
-    p_limpo     = gaussian(nuvem, 0.0, 2.0)
-    p_parcial   = gaussian(nuvem, 5.0, 2.5)
-    p_encoberto = gaussian(nuvem, 10.0, 2.5)
+    "limpo":     ("tipo_nuvem", 0.0, 2.0),
+    "parcial":   ("tipo_nuvem", 5.0, 2.5),
+    "encoberto": ("tipo_nuvem", 10.0, 2.5),
 
     # 5. Pertinências de TEMPERATURA
     # Frio: < 20°C (Favorece PV) | Calor: > 30°C (Desfavorece PV)
-    p_frio  = gaussian(temp, 20.0, 10.0)
-    p_calor = gaussian(temp, 35.0, 10.0)
+    "frio":  ("temp_ar", 20.0, 10.0),
+    "calor": ("temp_ar", 35.0, 10.0),
+}
 
-    regras = {}
+# 3. Noite: acima do limiar de hora_cos só a regra "noite" dispara
+LIMIAR_NOITE = 0.2
 
-    if p_noite > 0.5:
-        return {"noite": 1.0}
+# O horizonte decai linearmente até zero a partir de hora_cos = 0.1
+# nome -> (início, inclinação)
+ATENUACOES = {
+    "horizonte": (0.1, 10.0),
+}
 
-    # --- REGRAS ---
-    
+# Cada regra é o produto de fatores; cada fator é o máximo entre os itens
+# listados (nomes de pertinência ou pisos constantes).
+REGRAS = {
     # PICO (Meio-dia)
-    regras["pico_limpo_frio"]     = p_meio_dia * p_limpo * p_frio
-    regras["pico_limpo_calor"]    = p_meio_dia * p_limpo * p_calor
-    
-    regras["pico_parcial_frio"]   = p_meio_dia * p_parcial * p_frio
-    regras["pico_parcial_calor"]  = p_meio_dia * p_parcial * p_calor
-    
-    regras["pico_encoberto_frio"] = p_meio_dia * p_encoberto * p_frio
-    regras["pico_encoberto_calor"]= p_meio_dia * p_encoberto * p_calor
+    "pico_limpo_frio":      [["meio_dia"], ["limpo"], ["frio"]],
+    "pico_limpo_calor":     [["meio_dia"], ["limpo"], ["calor"]],
+
+    "pico_parcial_frio":    [["meio_dia"], ["parcial"], ["frio"]],
+    "pico_parcial_calor":   [["meio_dia"], ["parcial"], ["calor"]],
+
+    "pico_encoberto_frio":  [["meio_dia"], ["encoberto"], ["frio"]],
+    "pico_encoberto_calor": [["meio_dia"], ["encoberto"], ["calor"]],
 
     # MANHÃ
-    regras["dia_limpo_manha_frio"]      = p_manha_tarde * p_periodo_manha * p_limpo * p_frio
-    regras["dia_limpo_manha_calor"]     = p_manha_tarde * p_periodo_manha * p_limpo * p_calor
-    
-    regras["dia_parcial_manha_frio"]    = p_manha_tarde * p_periodo_manha * p_parcial * p_frio
-    regras["dia_parcial_manha_calor"]   = p_manha_tarde * p_periodo_manha * p_parcial * p_calor
+    "dia_limpo_manha_frio":    [["manha_tarde"], ["manha"], ["limpo"], ["frio"]],
+    "dia_limpo_manha_calor":   [["manha_tarde"], ["manha"], ["limpo"], ["calor"]],
+
+    "dia_parcial_manha_frio":  [["manha_tarde"], ["manha"], ["parcial"], ["frio"]],
+    "dia_parcial_manha_calor": [["manha_tarde"], ["manha"], ["parcial"], ["calor"]],
 
     # TARDE
-    regras["dia_limpo_tarde_frio"]      = p_manha_tarde * p_periodo_tarde * p_limpo * p_frio
-    regras["dia_parcial_tarde_frio"]    = p_manha_tarde * p_periodo_tarde * p_parcial * p_frio
-    regras["dia_encoberto_tarde_frio"]  = p_manha_tarde * p_periodo_tarde * p_encoberto * p_frio
+    "dia_limpo_tarde_frio":     [["manha_tarde"], ["tarde"], ["limpo"], ["frio"]],
+    "dia_parcial_tarde_frio":   [["manha_tarde"], ["tarde"], ["parcial"], ["frio"]],
+    "dia_encoberto_tarde_frio": [["manha_tarde"], ["tarde"], ["encoberto"], ["frio"]],
 
     # Catch-all para Encoberto (Manhã/Tarde calor ou geral)
-    regras["dia_encoberto"]             = p_manha_tarde * p_encoberto * max(p_calor, 0.2)
+    "dia_encoberto": [["manha_tarde"], ["encoberto"], ["calor", 0.2]],
 
     # HORIZONTE
-    regras["horizonte_nascer"]  = p_horizonte * p_periodo_manha * max(p_limpo, p_parcial)
-    regras["horizonte_por"]     = p_horizonte * p_periodo_tarde * max(p_limpo, p_parcial)
-    regras["horizonte_nublado"] = p_horizonte * p_encoberto
+    "horizonte_nascer":  [["horizonte"], ["manha"], ["limpo", "parcial"]],
+    "horizonte_por":     [["horizonte"], ["tarde"], ["limpo", "parcial"]],
+    "horizonte_nublado": [["horizonte"], ["encoberto"]],
+}
+
+# Ativações abaixo deste grau são ignoradas na média ponderada
+LIMIAR_ATIVACAO = 0.001
+
+def gaussian(x, mean, sigma):
+    return np.exp(-0.5 * ((x - mean) / sigma) ** 2)
+
+def calcular_ativacao(h_sin, h_cos, nuvem, temp):
+    entradas = {"hora_sin": h_sin, "hora_cos": h_cos, "tipo_nuvem": nuvem, "temp_ar": temp}
+
+    if h_cos > LIMIAR_NOITE:
+        return {"noite": 1.0}
+
+    p = {}
+    for nome, (entrada, media, sigma) in PERTINENCIAS.items():
+        p[nome] = gaussian(entradas[entrada], media, sigma)
+
+    for nome, (inicio, inclinacao) in ATENUACOES.items():
+        x = entradas[PERTINENCIAS[nome][0]]
+        if x > inicio:
+            p[nome] = max(0, p[nome] * (1 - (x - inicio) * inclinacao))
+
+    regras = {}
+    for regra, fatores in REGRAS.items():
+        grau = 1.0
+        for fator in fatores:
+            grau *= max(p[item] if isinstance(item, str) else item for item in fator)
+        regras[regra] = grau
 
     return regras
 
@@ -172,7 +199,7 @@ def avaliar_ghi_sugeno(h_sin, h_cos, nuvem, temp):
     denominador = 0.0
 
     for regra, grau in ativacoes.items():
-        if grau > 0.001:
+        if grau > LIMIAR_ATIVACAO:
             if regra in PESOS:
                 coefs = PESOS[regra]
                 w = np.array(coefs["w"])
@@ -0,0 +1,244 @@
+"""
+Geração dos gráficos de avaliação (evaluate-fuzzy.py).
+
+- Acima de LIMIAR_PONTOS pontos, os gráficos de dispersão viram mapas de
+  densidade (hexbin, em DPI_DENSIDADE), em vez de um marcador por ponto:
+  daí em diante o tempo de desenho e o tamanho do PNG não crescem mais com
+  o número de amostras. Abaixo do limiar o scatter desenha cada ponto, e o
+  custo cresce com eles.
+- Cada figura é uma tarefa independente (função + argumentos simples), que
+  pode ser renderizada em processos separados com o backend Agg.
+- Os gráficos de pertinência só são redesenhados quando as funções de
+  pertinência mudam (a assinatura fica nos metadados do PNG).
+"""
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Sem janelas; seguro em processos filhos
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+LIMIAR_PONTOS = 2000
+DPI = 300
+DPI_DENSIDADE = 150  # o hexbin não tem detalhe que justifique 300 dpi
+
+# Mesmas cores dos gráficos originais
+CORES_LINHA = ['b--', 'orange', 'r:']
+CORES_MAE = ['#90CAF9', '#FFCC80', '#EF9A9A']
+CORES_RMSE = ['#1976D2', '#F57C00', '#D32F2F']
+CORES_TERMOS = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
+
+
+def _estilo():
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 10
+
+
+# ======================================================
+# 1. FIGURAS
+# ======================================================
+
+def serie_temporal(caminho, indice, series, dpi=DPI):
+    """series: dict {'Real'|modelo: array}, alinhado a `indice`."""
+    _estilo()
+    estilos = {
+        'Real':    dict(fmt='k-', linewidth=2, alpha=0.8),
+        'XGBoost': dict(fmt='b--', alpha=0.7),
+        'Mamdani': dict(fmt='orange', alpha=0.8),
+        'Sugeno':  dict(fmt='r:', linewidth=2, alpha=0.8),
+    }
+    plt.figure(figsize=(14, 6))
+    for nome, valores in series.items():
+        estilo = dict(estilos.get(nome, {'fmt': '-'}))
+        plt.plot(indice, valores, estilo.pop('fmt'), label=nome, **estilo)
+    plt.title('Comparação Temporal das Predições de GHI')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.savefig(caminho, dpi=dpi)
+    plt.close()
+    return caminho
+
+
+def dispersao(caminho, real, predicoes, limiar=LIMIAR_PONTOS, dpi=None):
+    """
+    Real vs. predito para cada modelo. Com mais de `limiar` pontos desenha
+    um hexbin com contagem em escala log; abaixo disso, um scatter.
+    `dpi` padrão: DPI_DENSIDADE no hexbin, DPI no scatter.
+    """
+    _estilo()
+    modelos = list(predicoes)
+    densidade = len(real) > limiar
+    if dpi is None:
+        dpi = DPI_DENSIDADE if densidade else DPI
+    fig = plt.figure(figsize=(6 * len(modelos), 5))
+    for i, modelo in enumerate(modelos, 1):
+        ax = plt.subplot(1, len(modelos), i)
+        if densidade:
+            hb = ax.hexbin(real, predicoes[modelo], gridsize=80, extent=(0, 1000, 0, 1000),
+                           bins='log', mincnt=1, cmap='viridis')
+            fig.colorbar(hb, ax=ax, label='Contagem (log)')
+        else:
+            ax.scatter(real, predicoes[modelo], alpha=0.4)
+        ax.plot([0, 1000], [0, 1000], CORES_LINHA[(i - 1) % len(CORES_LINHA)], label=modelo, alpha=0.7)
+        ax.set_title(f'Real vs. {modelo}')
+        ax.set_xlabel('GHI Real (W/m²)')
+        ax.set_ylabel(f'GHI Predito ({modelo})')
+        ax.set_xlim(0, 1000)
+        ax.set_ylim(0, 1000)
+        ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=dpi)
+    plt.close(fig)
+    return caminho
+
+
+def barras_metricas(caminho, modelos, maes, rmses, dpi=DPI):
+    _estilo()
+    plt.figure(figsize=(10, 6))
+    x = np.arange(len(modelos))
+    w = 0.35
+    plt.bar(x - w/2, maes, w, label='MAE', color=CORES_MAE[:len(modelos)])
+    plt.bar(x + w/2, rmses, w, label='RMSE', color=CORES_RMSE[:len(modelos)])
+    plt.xticks(x, modelos)
+    plt.legend()
+    plt.grid(axis='y', alpha=0.3)
+    plt.savefig(caminho, dpi=dpi)
+    plt.close()
+    return caminho
+
+
+def pareto(caminho, tabela, dpi=DPI):
+    """
+    MAE x custo (µs por amostra em lote e latência de uma chamada) para a
+    tabela de relatorio_pareto.py, com a fronteira de Pareto destacada.
+    Configurações medidas em subamostra aparecem com marcador vazado.
+    """
+    _estilo()
+    fig, axes = plt.subplots(1, 2, figsize=(18, 7))
+    paineis = [('us_por_amostra', 'pareto_vazao', 'Tempo por amostra em lote (µs, log)'),
+               ('latencia_ms', 'pareto_latencia', 'Latência de uma chamada (ms, log)')]
+    motores = list(dict.fromkeys(tabela['motor']))
+    cores = dict(zip(motores, sns.color_palette('tab10', len(motores))))
+
+    for ax, (custo, fronteira, rotulo) in zip(axes, paineis):
+        for motor, grupo in tabela.groupby('motor', sort=False):
+            vazado = grupo['subamostra'].to_numpy()
+            ax.scatter(grupo[custo], grupo['MAE'], s=60, label=motor, zorder=3, linewidths=1.5,
+                       facecolors=[(1, 1, 1, 0) if v else cores[motor] for v in vazado],
+                       edgecolors=[cores[motor]] * len(grupo))
+        frente = tabela[tabela[fronteira]].sort_values(custo)
+        ax.step(frente[custo], frente['MAE'], where='post', color='k', linestyle='--',
+                alpha=0.6, label='Fronteira de Pareto', zorder=2)
+        for _, linha in tabela.iterrows():
+            ax.annotate(linha['configuracao'], (linha[custo], linha['MAE']), fontsize=7,
+                        xytext=(4, 4), textcoords='offset points')
+        ax.set_xscale('log')
+        ax.set_xlabel(rotulo)
+        ax.set_ylabel('MAE diurno (W/m²)')
+        ax.grid(True, alpha=0.3, which='both')
+    axes[0].legend(fontsize=8)
+    fig.suptitle('Precisão x Custo das Configurações de GHI', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=dpi)
+    plt.close(fig)
+    return caminho
+
+
+def dados_pertinencia(var, titulo):
+    """(titulo, universo, {termo: mf}) de uma variável do skfuzzy, sem o objeto em si."""
+    return titulo, np.asarray(var.universe), {t: np.asarray(var[t].mf) for t in var.terms}
+
+
+def _assinatura(variaveis):
+    h = hashlib.sha1()
+    for titulo, universo, termos in variaveis:
+        h.update(titulo.encode())
+        h.update(np.ascontiguousarray(universo, dtype=float).tobytes())
+        for termo, mf in termos.items():
+            h.update(termo.encode())
+            h.update(np.ascontiguousarray(mf, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def _atualizado(caminho, assinatura):
+    """True se o PNG existe e foi gerado a partir das mesmas pertinências."""
+    if not os.path.exists(caminho):
+        return False
+    from PIL import Image
+    try:
+        with Image.open(caminho) as imagem:
+            return imagem.info.get('Assinatura') == assinatura
+    except OSError:
+        return False
+
+
+def pertinencias(caminho, variaveis, cols=2, titulo_grande=False, forcar=False, dpi=DPI):
+    """
+    Funções de pertinência em uma grade de subplots. `variaveis` é uma lista
+    de dados_pertinencia(...). Não redesenha se o arquivo já corresponde às
+    mesmas funções (a menos que `forcar`).
+    """
+    assinatura = _assinatura(variaveis)
+    if not forcar and _atualizado(caminho, assinatura):
+        return None
+
+    _estilo()
+    n = len(variaveis)
+    cols = min(cols, n)
+    rows = int(np.ceil(n / cols))
+    if n == 1:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        axes = [ax]
+    else:
+        fig, axes = plt.subplots(rows, cols, figsize=(16, 5 * rows))
+        axes = axes.flatten()
+
+    for ax, (titulo, universo, termos) in zip(axes, variaveis):
+        for i, (termo, mf) in enumerate(termos.items()):
+            cor = CORES_TERMOS[i % len(CORES_TERMOS)]
+            ax.plot(universo, mf, label=termo, linewidth=2, color=cor)
+            ax.fill_between(universo, mf, alpha=0.1, color=cor)
+        if titulo_grande:
+            ax.set_title(titulo, fontsize=14, fontweight='bold')
+            ax.legend()
+        else:
+            ax.set_title(titulo, fontsize=12, fontweight='bold')
+            ax.legend(loc='upper right', fontsize=9)
+        ax.grid(True, alpha=0.3)
+        ax.set_ylim(-0.05, 1.05)
+
+    # Remove eixos vazios se houver
+    for j in range(n, len(axes)):
+        fig.delaxes(axes[j])
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=dpi, bbox_inches='tight', metadata={'Assinatura': assinatura})
+    plt.close(fig)
+    return caminho
+
+
+# ======================================================
+# 2. RENDERIZAÇÃO
+# ======================================================
+
+def _executar(tarefa):
+    funcao, kwargs = tarefa
+    return funcao(**kwargs)
+
+
+def renderizar(tarefas, workers=1):
+    """
+    Renderiza as tarefas [(função, kwargs)] em série ou em um pool de
+    processos. Retorna os caminhos gravados (None para figuras já em dia).
+    """
+    if workers <= 1 or len(tarefas) <= 1:
+        return [_executar(t) for t in tarefas]
+    # Método de início padrão da plataforma: o script chamador precisa da
+    # guarda `if __name__ == "__main__"` (filhos 'spawn' reimportam o módulo)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tarefas))) as pool:
+        return list(pool.map(_executar, tarefas))
@@ -0,0 +1,329 @@
+"""
+Ingestão de observações brutas (CSV/parquet do INMET) para o formato de
+entrada dos modelos.
+
+Os exports brutos têm apenas timestamp, cobertura de nuvens e temperatura.
+Este estágio lê o arquivo em blocos (pyarrow), deriva as features cíclicas
+com as convenções do projeto e grava um parquet colunar pronto para
+`python -m solar_fuzzy score`:
+- hora_sin = sin(2πh/24), hora_cos = cos(2πh/24), com h a hora local do
+  timestamp (cos = 1 à meia-noite, -1 ao meio-dia; sin = 1 às 06h, -1 às 18h);
+- dia_ano_sin/dia_ano_cos = sin/cos(2π·dia_do_ano/365.25), como no
+  conjunto de teste;
+- opcionalmente, geometria solar real (hora solar verdadeira, elevação e
+  cosseno do zênite) a partir de latitude/longitude, e hora_sin/hora_cos
+  calculados pela hora solar em vez da hora do relógio;
+- tipo_nuvem, temp_ar e as features cíclicas limitadas às faixas dos
+  universos (modelo_fuzzy.LIMITES).
+
+Tudo é aritmética vetorizada sobre os inteiros do timestamp, sem
+conversão para pandas por bloco.
+"""
+
+import os
+import argparse
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from modelo_fuzzy import ENTRADAS, LIMITES
+
+# Os timestamps do projeto são horário local de Brasília (UTC-3); o fuso só
+# é usado para a geometria solar, que precisa de UTC
+FUSO_PADRAO = -3.0
+TAMANHO_BLOCO = 1_000_000
+DIAS_ANO = 365.25
+
+COLUNAS_PADRAO = {
+    'timestamp': 'timestamp',
+    'tipo_nuvem': 'tipo_nuvem',
+    'temp_ar': 'temp_ar',
+    'latitude': 'latitude_inmet',
+    'longitude': 'longitude_inmet',
+}
+
+SEGUNDOS_DIA = 86400
+
+
+# ======================================================
+# 1. FEATURES TEMPORAIS
+# ======================================================
+
+def _segundos(timestamps):
+    """Segundos desde a época (int64) de um array datetime64 de qualquer unidade."""
+    return np.asarray(timestamps).astype('datetime64[s]').astype(np.int64)
+
+
+def hora_do_dia(segundos):
+    """Hora decimal (0-24) a partir de segundos desde a época."""
+    return np.mod(segundos, SEGUNDOS_DIA) / 3600.0
+
+
+def dia_do_ano(segundos):
+    """Dia do ano (1-366) a partir de segundos desde a época."""
+    dias = segundos // SEGUNDOS_DIA
+    anos = dias.astype('datetime64[D]').astype('datetime64[Y]')
+    return (dias - anos.astype('datetime64[D]').astype(np.int64) + 1).astype(np.int64)
+
+
+def ciclicas_hora(horas):
+    """(hora_sin, hora_cos) na convenção do projeto."""
+    angulo = 2 * np.pi * np.asarray(horas, dtype=float) / 24
+    return np.sin(angulo), np.cos(angulo)
+
+
+def ciclicas_dia_ano(dias):
+    """(dia_ano_sin, dia_ano_cos), como no conjunto de teste."""
+    angulo = 2 * np.pi * np.asarray(dias, dtype=float) / DIAS_ANO
+    return np.sin(angulo), np.cos(angulo)
+
+
+def geometria_solar(segundos_utc, latitude, longitude):
+    """
+    Posição do sol (aproximação de Spencer para declinação e equação do
+    tempo, erro de ~1 min na hora solar).
+
+    Returns:
+        dict com hora_solar (hora solar verdadeira, 0-24), elevacao_solar
+        (graus) e cos_zenite.
+    """
+    dia = dia_do_ano(segundos_utc)
+    hora_utc = hora_do_dia(segundos_utc)
+    gama = 2 * np.pi / 365 * (dia - 1 + (hora_utc - 12) / 24)
+
+    equacao_tempo = 229.18 * (0.000075 + 0.001868 * np.cos(gama) - 0.032077 * np.sin(gama)
+                              - 0.014615 * np.cos(2 * gama) - 0.040849 * np.sin(2 * gama))
+    declinacao = (0.006918 - 0.399912 * np.cos(gama) + 0.070257 * np.sin(gama)
+                  - 0.006758 * np.cos(2 * gama) + 0.000907 * np.sin(2 * gama)
+                  - 0.002697 * np.cos(3 * gama) + 0.00148 * np.sin(3 * gama))
+
+    hora_solar = np.mod(hora_utc + (4 * np.asarray(longitude) + equacao_tempo) / 60, 24)
+    angulo_horario = np.radians(15 * (hora_solar - 12))
+    lat = np.radians(latitude)
+    cos_zenite = np.clip(np.sin(lat) * np.sin(declinacao)
+                         + np.cos(lat) * np.cos(declinacao) * np.cos(angulo_horario), -1, 1)
+    return {
+        'hora_solar': hora_solar,
+        'elevacao_solar': np.degrees(np.arcsin(cos_zenite)),
+        'cos_zenite': cos_zenite,
+    }
+
+
+# ======================================================
+# 2. PREPARAÇÃO DE UM BLOCO
+# ======================================================
+
+def preparar_bloco(tabela, colunas=None, fuso=FUSO_PADRAO, solar=False, hora='relogio',
+                   latitude=None, longitude=None, formato_tempo=None):
+    """
+    Converte um bloco bruto (pyarrow Table/RecordBatch) nas features dos modelos.
+
+    Args:
+        colunas: mapeamento papel -> nome da coluna (padrão: COLUNAS_PADRAO).
+        fuso: horas em relação a UTC do timestamp (só para a geometria solar).
+        solar: acrescenta hora_solar, elevacao_solar e cos_zenite.
+        hora: 'relogio' (hora do timestamp, como no treino) ou 'solar'
+            (hora solar verdadeira) para hora_sin/hora_cos.
+        latitude/longitude: valores fixos, se o arquivo não tiver as colunas.
+        formato_tempo: formato strptime, se o timestamp vier como texto.
+
+    Returns:
+        pyarrow Table com timestamp, ENTRADAS (ordem dos modelos),
+        dia_ano_sin, dia_ano_cos, latitude/longitude com os nomes de
+        `colunas` (se houver) e a geometria solar (se pedida).
+    """
+    colunas = {**COLUNAS_PADRAO, **(colunas or {})}
+    if hora not in ('relogio', 'solar'):
+        raise ValueError(f"Hora desconhecida: {hora}")
+
+    tempo = tabela.column(colunas['timestamp'])
+    if pa.types.is_string(tempo.type) or pa.types.is_large_string(tempo.type):
+        tempo = pc.strptime(tempo, format=formato_tempo or '%Y-%m-%d %H:%M:%S', unit='s')
+    tempo = pc.cast(tempo, pa.timestamp('s')) if pa.types.is_date(tempo.type) else tempo
+    segundos = _segundos(tempo.to_numpy(zero_copy_only=False))
+
+    nomes = tabela.schema.names
+    lat = tabela.column(colunas['latitude']).to_numpy() if colunas['latitude'] in nomes else latitude
+    lon = tabela.column(colunas['longitude']).to_numpy() if colunas['longitude'] in nomes else longitude
+
+    extras = {}
+    if solar or hora == 'solar':
+        if lat is None or lon is None:
+            raise ValueError("Geometria solar requer latitude/longitude (colunas ou valores fixos)")
+        extras = geometria_solar(segundos - int(fuso * 3600), lat, lon)
+
+    horas = extras['hora_solar'] if hora == 'solar' else hora_do_dia(segundos)
+    h_sin, h_cos = ciclicas_hora(horas)
+    d_sin, d_cos = ciclicas_dia_ano(dia_do_ano(segundos))
+
+    valores = {
+        'hora_sin': h_sin,
+        'hora_cos': h_cos,
+        'tipo_nuvem': tabela.column(colunas['tipo_nuvem']).to_numpy(zero_copy_only=False),
+        'temp_ar': tabela.column(colunas['temp_ar']).to_numpy(zero_copy_only=False),
+    }
+    for var in ENTRADAS:
+        valores[var] = np.clip(np.asarray(valores[var], dtype=float), *LIMITES[var])
+
+    saida = {'timestamp': pa.array(segundos.astype('datetime64[s]').astype('datetime64[ns]'))}
+    saida.update({var: valores[var] for var in ENTRADAS})
+    saida['dia_ano_sin'] = d_sin
+    saida['dia_ano_cos'] = d_cos
+    if lat is not None and lon is not None:
+        saida[colunas['latitude']] = np.broadcast_to(np.asarray(lat, dtype=float), segundos.shape)
+        saida[colunas['longitude']] = np.broadcast_to(np.asarray(lon, dtype=float), segundos.shape)
+    if solar:
+        saida.update(extras)
+    return pa.table(saida)
+
+
+# ======================================================
+# 3. LEITURA EM BLOCOS E GRAVAÇÃO
+# ======================================================
+
+def _bloco_vazio(esquema):
+    return pa.RecordBatch.from_arrays([pa.array([], type=campo.type) for campo in esquema], schema=esquema)
+
+
+def ler_em_blocos(caminho, colunas_necessarias=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Itera sobre blocos (RecordBatch) de um parquet ou CSV, lendo só as colunas
+    pedidas que existem no arquivo (ex.: latitude/longitude são opcionais).
+    Um arquivo sem linhas produz um bloco vazio, para que a saída tenha o
+    esquema completo.
+    """
+    if caminho.endswith('.parquet'):
+        arquivo = pq.ParquetFile(caminho)
+        existentes = set(arquivo.schema_arrow.names)
+        pedidas = None if colunas_necessarias is None else [c for c in colunas_necessarias if c in existentes]
+        if arquivo.metadata.num_rows == 0:
+            esquema = arquivo.schema_arrow
+            yield _bloco_vazio(pa.schema([esquema.field(c) for c in (pedidas or esquema.names)]))
+            return
+        yield from arquivo.iter_batches(batch_size=tamanho_bloco, columns=pedidas)
+        return
+
+    # CSV: o cabeçalho (primeiro bloco pequeno) diz quais colunas existem;
+    # include_missing_columns criaria colunas nulas, tomadas como presentes
+    pedidas = None
+    if colunas_necessarias is not None:
+        cabecalho = pv.open_csv(caminho, read_options=pv.ReadOptions(block_size=1 << 16))
+        existentes = set(cabecalho.schema.names)
+        cabecalho.close()
+        pedidas = [c for c in colunas_necessarias if c in existentes]
+
+    # Bloco em bytes, estimado para ~tamanho_bloco linhas de ~64 bytes
+    leitor = pv.open_csv(
+        caminho,
+        read_options=pv.ReadOptions(block_size=max(1 << 20, tamanho_bloco * 64)),
+        convert_options=pv.ConvertOptions(include_columns=pedidas),
+    )
+    vazio = True
+    for lote in leitor:
+        vazio = False
+        yield lote
+    if vazio:
+        yield _bloco_vazio(leitor.schema)
+
+
+def _com_indice_pandas(tabela):
+    """Marca 'timestamp' como índice do pandas (lido de volta como o X_test)."""
+    esquema = pa.Schema.from_pandas(tabela.slice(0, 0).to_pandas().set_index('timestamp'))
+    return tabela.select(esquema.names).cast(esquema)
+
+
+@contextmanager
+def gravacao_atomica(saida):
+    """
+    Fornece um caminho temporário (<saida>.parcial) que só é renomeado para
+    `saida` se o bloco terminar sem exceção. Em caso de falha o temporário
+    é removido, e uma falha no meio da gravação não deixa um parquet
+    truncado (mas válido) no lugar da saída.
+    """
+    pasta = os.path.dirname(saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f'{saida}.parcial'
+    try:
+        yield temporario
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, saida)
+
+
+def ingerir(entrada, saida, colunas=None, tamanho_bloco=TAMANHO_BLOCO, **opcoes):
+    """
+    Lê `entrada` em blocos, prepara cada um com `preparar_bloco(**opcoes)` e
+    grava `saida` (parquet). Retorna estatísticas (linhas, segundos).
+    """
+    colunas = {**COLUNAS_PADRAO, **(colunas or {})}
+    necessarias = list(dict.fromkeys(colunas.values()))
+
+    escritor = None
+    linhas = 0
+    inicio = time.perf_counter()
+    with gravacao_atomica(saida) as temporario:
+        try:
+            for bloco in ler_em_blocos(entrada, necessarias, tamanho_bloco):
+                tabela = preparar_bloco(bloco, colunas, **opcoes)
+                if escritor is None:
+                    esquema = _com_indice_pandas(tabela).schema
+                    escritor = pq.ParquetWriter(temporario, esquema)
+                escritor.write_table(tabela.select(esquema.names).cast(esquema))
+                linhas += tabela.num_rows
+        finally:
+            if escritor is not None:
+                escritor.close()
+    return {'linhas': linhas, 'segundos': time.perf_counter() - inicio}
+
+
+# ======================================================
+# 4. EXECUÇÃO
+# ======================================================
+
+def adicionar_argumentos(parser):
+    """Argumentos da ingestão (compartilhados com `python -m solar_fuzzy ingest`)."""
+    parser.add_argument('entrada', help="CSV ou parquet bruto")
+    parser.add_argument('saida', help="Parquet de saída com as features")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO)
+    parser.add_argument('--coluna-tempo', default=COLUNAS_PADRAO['timestamp'])
+    parser.add_argument('--coluna-nuvem', default=COLUNAS_PADRAO['tipo_nuvem'])
+    parser.add_argument('--coluna-temp', default=COLUNAS_PADRAO['temp_ar'])
+    parser.add_argument('--coluna-lat', default=COLUNAS_PADRAO['latitude'])
+    parser.add_argument('--coluna-lon', default=COLUNAS_PADRAO['longitude'])
+    parser.add_argument('--latitude', type=float, help="Latitude fixa (arquivo de uma estação)")
+    parser.add_argument('--longitude', type=float, help="Longitude fixa (arquivo de uma estação)")
+    parser.add_argument('--formato-tempo', help="Formato strptime do timestamp textual")
+    parser.add_argument('--fuso', type=float, default=FUSO_PADRAO, help="Horas em relação a UTC")
+    parser.add_argument('--solar', action='store_true', help="Acrescenta a geometria solar")
+    parser.add_argument('--hora', choices=['relogio', 'solar'], default='relogio',
+                        help="Hora usada em hora_sin/hora_cos")
+
+
+def executar(args):
+    colunas = {
+        'timestamp': args.coluna_tempo, 'tipo_nuvem': args.coluna_nuvem, 'temp_ar': args.coluna_temp,
+        'latitude': args.coluna_lat, 'longitude': args.coluna_lon,
+    }
+    est = ingerir(args.entrada, args.saida, colunas, args.tamanho_bloco,
+                  fuso=args.fuso, solar=args.solar, hora=args.hora,
+                  latitude=args.latitude, longitude=args.longitude, formato_tempo=args.formato_tempo)
+    print(f"{est['linhas']} linhas em {est['segundos']:.2f}s "
+          f"({est['linhas'] / max(est['segundos'], 1e-9):.0f} linhas/s) -> {args.saida}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deriva as entradas dos modelos a partir de observações brutas.")
+    adicionar_argumentos(parser)
+    executar(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Intervalos de predição de GHI por propagação Monte Carlo da incerteza das
+entradas.
+
+As observações de nuvem (tipo_nuvem) e temperatura são ruidosas; em vez de
+um único valor de avaliar_ghi_sugeno/avaliar_ghi_mamdani, cada amostra é
+perturbada segundo modelos de ruído configuráveis e os sorteios de todas as
+amostras são avaliados em uma única chamada em lote do modelo compilado.
+O resultado são faixas de percentis por amostra.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modelo_fuzzy import carregar_modelo, MODELOS_DIR, ENTRADAS
+
+X_TEST_PATH = 'data/X_test.parquet'
+
+# Modelos de ruído por entrada: distribuição e escala
+# - 'normal': escala = desvio padrão
+# - 'uniforme': escala = meia largura do intervalo
+RUIDO_PADRAO = {
+    'tipo_nuvem': {'distribuicao': 'normal', 'escala': 1.5},
+    'temp_ar':    {'distribuicao': 'normal', 'escala': 1.0},
+}
+
+PERCENTIS = (5, 50, 95)
+N_SORTEIOS = 1000
+
+
+# ======================================================
+# 1. PERTURBAÇÃO DAS ENTRADAS
+# ======================================================
+
+def sortear_entradas(X, n_sorteios=N_SORTEIOS, ruido=None, semente=None):
+    """
+    Replica cada linha de X (N x 4) em `n_sorteios` cópias perturbadas.
+    Retorna um array (N x S x 4). Os limites são aplicados pelos modelos.
+    """
+    ruido = RUIDO_PADRAO if ruido is None else ruido
+    rng = np.random.default_rng(semente)
+    sorteios = np.repeat(np.asarray(X, dtype=float)[:, None, :], n_sorteios, axis=1)
+    forma = sorteios.shape[:2]
+
+    for var, spec in ruido.items():
+        j = ENTRADAS.index(var)
+        if spec['distribuicao'] == 'normal':
+            sorteios[:, :, j] += rng.normal(0.0, spec['escala'], size=forma)
+        elif spec['distribuicao'] == 'uniforme':
+            sorteios[:, :, j] += rng.uniform(-spec['escala'], spec['escala'], size=forma)
+        else:
+            raise ValueError(f"Distribuição de ruído desconhecida: {spec['distribuicao']}")
+    return sorteios
+
+
+# ======================================================
+# 2. INTERVALOS
+# ======================================================
+
+def intervalos_monte_carlo(modelo, h_sin, h_cos, nuvem, temp, n_sorteios=N_SORTEIOS,
+                           ruido=None, percentis=PERCENTIS, semente=None):
+    """
+    Faixas de GHI por amostra. `modelo` é um modelo compilado (modelo_fuzzy)
+    ou o nome de um arquivo em modelos/ ('mamdani', 'sugeno').
+
+    Retorna um DataFrame com a predição nominal (sem ruído), a média dos
+    sorteios e uma coluna por percentil (p5, p50, p95, ...).
+    """
+    if isinstance(modelo, str):
+        modelo = carregar_modelo(f'{MODELOS_DIR}/{modelo}')
+
+    X = np.column_stack(np.broadcast_arrays(h_sin, h_cos, nuvem, temp)).astype(float)
+    sorteios = sortear_entradas(X, n_sorteios, ruido, semente)
+
+    # Uma única avaliação em lote para N x S pontos
+    y = modelo.avaliar_lote(*sorteios.reshape(-1, len(ENTRADAS)).T).reshape(len(X), n_sorteios)
+
+    resultado = pd.DataFrame({
+        'nominal': modelo.avaliar_lote(*X.T),
+        'media': y.mean(axis=1),
+    })
+    for p, valores in zip(percentis, np.percentile(y, percentis, axis=1)):
+        resultado[f'p{p:g}'] = valores
+    return resultado
+
+
+# ======================================================
+# 3. EXECUÇÃO (UM DIA POR ESTAÇÃO)
+# ======================================================
+
+def main():
+    from avaliacao_estacoes import identificar_estacoes
+
+    parser = argparse.ArgumentParser(description="Faixas de GHI por Monte Carlo para um dia do conjunto de teste.")
+    parser.add_argument('--data', default='2024-06-01', help="Dia a avaliar (AAAA-MM-DD)")
+    parser.add_argument('--modelo', default='sugeno', choices=['mamdani', 'sugeno'])
+    parser.add_argument('--sorteios', type=int, default=N_SORTEIOS)
+    parser.add_argument('--sigma-nuvem', type=float, default=RUIDO_PADRAO['tipo_nuvem']['escala'])
+    parser.add_argument('--sigma-temp', type=float, default=RUIDO_PADRAO['temp_ar']['escala'])
+    args = parser.parse_args()
+
+    ruido = {
+        'tipo_nuvem': {'distribuicao': 'normal', 'escala': args.sigma_nuvem},
+        'temp_ar':    {'distribuicao': 'normal', 'escala': args.sigma_temp},
+    }
+    modelo = carregar_modelo(f'{MODELOS_DIR}/{args.modelo}')
+    X_test = pd.read_parquet(X_TEST_PATH)
+    dia = X_test.loc[args.data]
+    dia = dia.assign(estacao=identificar_estacoes(dia))
+
+    for estacao, grupo in dia.groupby('estacao'):
+        inicio = time.perf_counter()
+        faixas = intervalos_monte_carlo(modelo, *grupo[ENTRADAS].to_numpy().T,
+                                        n_sorteios=args.sorteios, ruido=ruido, semente=0)
+        duracao = time.perf_counter() - inicio
+        faixas.index = grupo.index.strftime('%H:%M')
+        print(f"\n--- Estação {estacao} ({len(grupo)} horas x {args.sorteios} sorteios: {duracao * 1000:.0f} ms) ---")
+        print(faixas.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Métricas de erro com intervalos de confiança e recortes por faixa.
+
+- Intervalos por bootstrap (Poisson): cada reamostragem é um vetor de pesos
+  ~ Poisson(1); somas ponderadas de |e|, e², y, y² para todos os modelos
+  saem de um único produto de matrizes por bloco de reamostragens, sem
+  laços Python por amostra. Também são reportadas as diferenças pareadas
+  entre modelos (ex.: Mamdani - Sugeno), para dizer se são significativas.
+- Recortes por hora, faixa de nuvem e faixa de temperatura, calculados com
+  np.bincount sobre códigos de grupo concatenados (uma passada por
+  estatística, para todos os recortes de uma vez).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import poisson
+
+# Amostras com GHI real acima deste valor (W/m²) entram nas métricas "diurnas"
+LIMIAR_DIURNO = 10
+
+FAIXAS_NUVEM = [0, 2, 4, 6, 8, 10]
+FAIXAS_TEMP = [10, 20, 25, 30, 35, 45]
+
+
+def _como_matriz(predicoes):
+    """dict {modelo: array} -> (nomes, matriz M x N)."""
+    nomes = list(predicoes)
+    return nomes, np.vstack([np.asarray(predicoes[m], dtype=np.float64) for m in nomes])
+
+
+def _metricas_de_somas(n, soma_abs, soma_quad, soma_y, soma_y2):
+    """MAE, RMSE e R² a partir de somas (ponderadas) por grupo/réplica."""
+    n_seguro = np.where(n > 0, n, np.nan)
+    mae = soma_abs / n_seguro
+    rmse = np.sqrt(soma_quad / n_seguro)
+    sst = soma_y2 - soma_y ** 2 / n_seguro
+    r2 = 1 - soma_quad / np.where(sst > 0, sst, np.nan)
+    return mae, rmse, r2
+
+
+def mae_rmse_r2(y_true, y_pred):
+    """MAE, RMSE e R² pontuais (sem intervalo de confiança)."""
+    y = np.asarray(y_true, dtype=np.float64)
+    erro = np.asarray(y_pred, dtype=np.float64) - y
+    r2 = 1 - np.sum(erro ** 2) / np.sum((y - y.mean()) ** 2)
+    return np.mean(np.abs(erro)), np.sqrt(np.mean(erro ** 2)), r2
+
+
+# ======================================================
+# 1. BOOTSTRAP
+# ======================================================
+
+# Quantis de Poisson(1) em 2^16 níveis: sortear uint16 e consultar a tabela é
+# bem mais rápido que rng.poisson para bilhões de pesos
+_TABELA_POISSON = poisson.ppf((np.arange(65536) + 0.5) / 65536, 1.0).astype(np.float32)
+
+
+def _pesos_poisson(rng, forma):
+    return _TABELA_POISSON[rng.integers(0, 65536, size=forma, dtype=np.uint16)]
+
+
+def bootstrap_metricas(y_true, predicoes, n_bootstrap=2000, confianca=0.95, semente=0,
+                       max_elementos_bloco=20_000_000):
+    """
+    MAE/RMSE/R² de cada modelo com IC por bootstrap, mais as diferenças
+    pareadas entre cada par de modelos.
+
+    Args:
+        y_true: array (N,).
+        predicoes: dict {modelo: array (N,)}.
+        max_elementos_bloco: limite de réplicas x N por bloco de pesos.
+
+    Returns:
+        DataFrame com colunas modelo, metrica, valor, ic_inf, ic_sup.
+        Linhas 'A - B' são diferenças (um IC que não contém 0 indica
+        diferença significativa).
+    """
+    y = np.asarray(y_true, dtype=np.float64)
+    nomes, P = _como_matriz(predicoes)
+    erro = P - y
+
+    # Colunas agregadas por produto de matrizes: [|e| por modelo, e² por modelo, y, y², 1]
+    colunas = np.column_stack([np.abs(erro).T, (erro ** 2).T, y, y ** 2, np.ones_like(y)])
+    M = len(nomes)
+
+    def metricas(somas):
+        soma_abs, soma_quad = somas[:, :M], somas[:, M:2 * M]
+        soma_y, soma_y2, n = somas[:, [2 * M]], somas[:, [2 * M + 1]], somas[:, [2 * M + 2]]
+        return np.stack(_metricas_de_somas(n, soma_abs, soma_quad, soma_y, soma_y2))  # (3, B, M)
+
+    pontual = metricas(colunas.sum(axis=0, keepdims=True))[:, 0]  # (3, M)
+
+    rng = np.random.default_rng(semente)
+    bloco = max(1, min(n_bootstrap, max_elementos_bloco // max(len(y), 1)))
+    replicas = []
+    for inicio in range(0, n_bootstrap, bloco):
+        pesos = _pesos_poisson(rng, (min(bloco, n_bootstrap - inicio), len(y)))
+        replicas.append(metricas(pesos @ colunas.astype(np.float32)))
+    replicas = np.concatenate(replicas, axis=1).astype(np.float64)  # (3, B, M)
+
+    alfa = (1 - confianca) / 2
+    linhas = []
+    nomes_metricas = ['MAE', 'RMSE', 'R2']
+
+    def adicionar(rotulo, k, valor, amostras):
+        inf, sup = np.nanquantile(amostras, [alfa, 1 - alfa])
+        linhas.append({'modelo': rotulo, 'metrica': nomes_metricas[k],
+                       'valor': valor, 'ic_inf': inf, 'ic_sup': sup})
+
+    for k in range(3):
+        for j, nome in enumerate(nomes):
+            adicionar(nome, k, pontual[k, j], replicas[k, :, j])
+        for a in range(M):
+            for b in range(a + 1, M):
+                adicionar(f'{nomes[a]} - {nomes[b]}', k, pontual[k, a] - pontual[k, b],
+                          replicas[k, :, a] - replicas[k, :, b])
+    return pd.DataFrame(linhas)
+
+
+# ======================================================
+# 2. RECORTES POR FAIXA
+# ======================================================
+
+def hora_de_ciclicas(h_sin, h_cos):
+    """
+    Hora do dia (0-23) a partir de hora_sin/hora_cos, na convenção do
+    projeto: cos = 1 à meia-noite, -1 ao meio-dia; sin = 1 às 06h, -1 às 18h.
+    """
+    angulo = np.arctan2(h_sin, h_cos)
+    return np.rint(np.mod(angulo * 24 / (2 * np.pi), 24)).astype(int) % 24
+
+
+def erros_por_faixa(y_true, predicoes, hora, nuvem, temp, faixas_nuvem=FAIXAS_NUVEM, faixas_temp=FAIXAS_TEMP):
+    """
+    MAE, RMSE, R², viés e contagem por hora, faixa de nuvem e faixa de
+    temperatura, para todos os modelos.
+
+    Returns:
+        DataFrame com colunas recorte ('hora'|'tipo_nuvem'|'temp_ar'), faixa,
+        modelo, N, MAE, RMSE, R2, vies.
+    """
+    y = np.asarray(y_true, dtype=np.float64)
+    nomes, P = _como_matriz(predicoes)
+    erro = P - y
+
+    cod_hora = np.asarray(hora, dtype=int)
+    cod_nuvem = np.clip(np.digitize(nuvem, faixas_nuvem[1:-1]), 0, len(faixas_nuvem) - 2)
+    cod_temp = np.clip(np.digitize(temp, faixas_temp[1:-1]), 0, len(faixas_temp) - 2)
+    rotulos = (
+        [('hora', f'{h:02d}h') for h in range(24)]
+        + [('tipo_nuvem', f'[{a}, {b})') for a, b in zip(faixas_nuvem[:-1], faixas_nuvem[1:])]
+        + [('temp_ar', f'[{a}, {b})') for a, b in zip(faixas_temp[:-1], faixas_temp[1:])]
+    )
+    deslocamentos = np.cumsum([0, 24, len(faixas_nuvem) - 1])
+    codigos = np.concatenate([cod_hora + deslocamentos[0], cod_nuvem + deslocamentos[1],
+                              cod_temp + deslocamentos[2]])
+    n_grupos = len(rotulos)
+
+    def somar(valores):
+        return np.bincount(codigos, weights=np.tile(valores, 3), minlength=n_grupos)
+
+    n = somar(np.ones_like(y))
+    soma_y, soma_y2 = somar(y), somar(y ** 2)
+
+    tabelas = []
+    for j, nome in enumerate(nomes):
+        soma_erro = somar(erro[j])
+        mae, rmse, r2 = _metricas_de_somas(n, somar(np.abs(erro[j])), somar(erro[j] ** 2), soma_y, soma_y2)
+        tabelas.append(pd.DataFrame({
+            'recorte': [r for r, _ in rotulos],
+            'faixa': [f for _, f in rotulos],
+            'modelo': nome,
+            'N': n.astype(int),
+            'MAE': mae,
+            'RMSE': rmse,
+            'R2': r2,
+            'vies': soma_erro / np.where(n > 0, n, np.nan),
+        }))
+    return pd.concat(tabelas, ignore_index=True)
@@ -0,0 +1,778 @@
+"""
+Formato serializado e compacto dos modelos fuzzy (Mamdani e Sugeno).
+
+Cada modelo é salvo em dois arquivos com o mesmo nome base:
+- <nome>.json: definição (variáveis, termos, parâmetros das pertinências,
+  regras, defuzzificação e PESOS do Sugeno);
+- <nome>.npz: arrays pré-computados (universos e pertinências amostradas do
+  Mamdani, matrizes de pesos do Sugeno).
+
+O carregador não constrói `ctrl.ControlSystem`: a inferência é feita de forma
+vetorizada em NumPy sobre lotes de amostras, o que permite que workers e o
+app carreguem um modelo compilado em milissegundos e troquem de versão sem
+editar código.
+"""
+
+import os
+import json
+import tracemalloc
+
+import numpy as np
+
+FORMATO = 1
+MODELOS_DIR = 'modelos'
+
+# Ordem das entradas em todas as interfaces do projeto
+ENTRADAS = ['hora_sin', 'hora_cos', 'tipo_nuvem', 'temp_ar']
+
+# Faixas aplicadas pelos np.clip de avaliar_ghi_mamdani/avaliar_ghi_sugeno
+LIMITES = {'hora_sin': [-1, 1], 'hora_cos': [-1, 1], 'tipo_nuvem': [0, 10], 'temp_ar': [10, 45]}
+
+TAMANHO_LOTE = 1024
+
+# Orçamento padrão de memória de trabalho de `avaliar_com_orcamento`
+LIMITE_MEMORIA = 256 * 2 ** 20
+# Teto da memória de trabalho por lote: lotes maiores saem do cache e ficam
+# mais lentos, sem ganho algum
+LOTE_CACHE = 16 * 2 ** 20
+
+
+# ======================================================
+# 1. MAMDANI
+# ======================================================
+
+def construir_mf(universo, funcao, params):
+    """
+    Aplica a função de pertinência skfuzzy `funcao` com os parâmetros da
+    tabela (usada por ghi_mamdani e para recriar os arrays sem o .npz).
+    """
+    import skfuzzy as fuzz
+    if funcao == 'gaussmf':
+        return fuzz.gaussmf(universo, *params)
+    return getattr(fuzz, funcao)(universo, params)
+
+
+def _avaliar_antecedente(no, pertinencias):
+    """Avalia a árvore de antecedentes (E = mínimo, OU = máximo) para o lote."""
+    if 'e' in no:
+        return np.fmin.reduce([_avaliar_antecedente(filho, pertinencias) for filho in no['e']])
+    if 'ou' in no:
+        return np.fmax.reduce([_avaliar_antecedente(filho, pertinencias) for filho in no['ou']])
+    return pertinencias[no['var']][no['termo']]
+
+
+def _contar_folhas(no):
+    filhos = no.get('e') or no.get('ou')
+    return sum(_contar_folhas(f) for f in filhos) if filhos else 1
+
+
+def _pesos_centroide(universo):
+    """
+    Pesos da integração por trapézios de `skfuzzy.defuzz(..., 'centroid')`.
+    Área e momento de cada trapézio são lineares em (y1, y2), então as somas
+    viram produtos matriz-vetor: área = mf @ pesos_area, momento = mf @ pesos_momento.
+    """
+    x1 = universo[:-1]
+    dx = np.diff(universo)
+    pesos_area = np.zeros_like(universo)
+    pesos_momento = np.zeros_like(universo)
+    # Contribuição de y1 (início do trapézio) e de y2 (fim do trapézio)
+    pesos_area[:-1] += 0.5 * dx
+    pesos_area[1:] += 0.5 * dx
+    pesos_momento[:-1] += dx ** 2 / 6.0 + 0.5 * dx * x1
+    pesos_momento[1:] += dx ** 2 / 3.0 + 0.5 * dx * x1
+    return pesos_area, pesos_momento
+
+
+def _centroide(mf, pesos_area, pesos_momento):
+    """
+    Centroide linha a linha. Linhas sem área retornam 0.0, como o `except`
+    de `avaliar_ghi_mamdani`.
+    """
+    soma_area = mf @ pesos_area
+    soma_momento = mf @ pesos_momento
+    return np.divide(soma_momento, soma_area, out=np.zeros_like(soma_area), where=soma_area > 0)
+
+
+def _descrever_antecedente(no):
+    if 'e' in no:
+        return ' E '.join(_descrever_antecedente(f) for f in no['e'])
+    if 'ou' in no:
+        return '(' + ' OU '.join(_descrever_antecedente(f) for f in no['ou']) + ')'
+    return f"{no['var']}[{no['termo']}]"
+
+
+def _explicar(modelo, h_sin, h_cos, nuvem, temp, top_k, tamanho_lote):
+    """
+    Laço comum do modo explicação: matriz de disparo (N x R) e contribuição
+    de cada regra para a saída (N x R), ambas em float32, mais o texto de
+    cada regra. Com `top_k`, guarda apenas as k regras de maior disparo por
+    amostra (formato esparso).
+    """
+    X = np.column_stack(np.broadcast_arrays(h_sin, h_cos, nuvem, temp)).astype(float)
+    n_regras = len(modelo.nomes_regras)
+    ativacoes = np.empty((len(X), n_regras), dtype=np.float32)
+    contribuicoes = np.empty((len(X), n_regras), dtype=np.float32)
+    saida = np.empty(len(X))
+    for inicio in range(0, len(X), tamanho_lote):
+        fim = inicio + tamanho_lote
+        ativacoes[inicio:fim], contribuicoes[inicio:fim], saida[inicio:fim] = \
+            modelo._explicar_bloco(X[inicio:fim])
+
+    # `saida` é a do modelo compilado (pode diferir alguns W/m² do skfuzzy)
+    explicacao = {'regras': modelo.nomes_regras, 'descricoes': modelo.descrever_regras(), 'saida': saida}
+    if top_k is None:
+        explicacao['ativacoes'] = ativacoes
+        explicacao['contribuicoes'] = contribuicoes
+        return explicacao
+
+    indices = np.argsort(-ativacoes, axis=1, kind='stable')[:, :top_k]
+    explicacao['indices'] = indices.astype(np.int16)
+    explicacao['ativacoes'] = np.take_along_axis(ativacoes, indices, axis=1)
+    explicacao['contribuicoes'] = np.take_along_axis(contribuicoes, indices, axis=1)
+    return explicacao
+
+
+class ModeloMamdani:
+    """Mamdani compilado: pertinências interpoladas, regras min/max e centroide."""
+
+    tipo = 'mamdani'
+
+    def __init__(self, definicao, arrays):
+        if definicao['defuzzificacao'] != 'centroid':
+            raise ValueError(f"Defuzzificação não suportada: {definicao['defuzzificacao']}")
+        self.definicao = definicao
+        self.saida = definicao['saida']
+        self.universos = {}
+        self.mfs = {}
+        for var, spec in definicao['variaveis'].items():
+            self.universos[var] = arrays[f'universo:{var}']
+            self.mfs[var] = {termo: arrays[f'mf:{var}:{termo}'] for termo in spec['termos']}
+
+        self.regras = definicao['regras']
+        self.nomes_regras = [f'R{i + 1}' for i in range(len(self.regras))]
+        self.termos_saida = list(definicao['variaveis'][self.saida]['termos'])
+        # Regras agrupadas por termo consequente (acumulação por máximo)
+        self.regras_por_termo = [
+            [i for i, r in enumerate(self.regras) if r['entao'] == termo]
+            for termo in self.termos_saida
+        ]
+        self.mf_saida = np.vstack([self.mfs[self.saida][t] for t in self.termos_saida])
+        # Faixa [a, b) do universo onde cada termo de saída é não nulo: a
+        # agregação só precisa tocar essas colunas
+        self.suportes = []
+        for mf in self.mf_saida:
+            nao_nulos = np.flatnonzero(mf > 0)
+            self.suportes.append((nao_nulos[0], nao_nulos[-1] + 1) if len(nao_nulos) else (0, 0))
+        self.pesos_centroide = _pesos_centroide(self.universos[self.saida])
+        self._compilar_conjuncoes()
+
+    def pertinencias(self, X):
+        """Graus de pertinência de cada termo de entrada para o lote X (N x 4)."""
+        resultado = {}
+        for j, var in enumerate(ENTRADAS):
+            universo = self.universos[var]
+            x = np.clip(X[:, j], universo[0], universo[-1])
+            resultado[var] = {
+                termo: np.interp(x, universo, mf) for termo, mf in self.mfs[var].items()
+            }
+        return resultado
+
+    def _compilar_conjuncoes(self):
+        """
+        Regras que são só conjunções de termos simples (como as geradas por
+        Wang-Mendel) viram uma matriz de índices (R x V) sobre as colunas de
+        pertinência, avaliada com um único gather + mínimo. A coluna extra de
+        uns preenche regras com menos termos. As demais usam a árvore.
+        """
+        self.colunas_termos = {(var, termo): i for i, (var, termo) in enumerate(
+            (var, termo) for var in ENTRADAS for termo in self.mfs[var])}
+        coluna_uns = len(self.colunas_termos)
+
+        conjuncoes = []
+        self.regras_arvore = []
+        for i, regra in enumerate(self.regras):
+            no = regra['se']
+            filhos = no['e'] if 'e' in no else [no]
+            if all('var' in f for f in filhos):
+                conjuncoes.append((i, [self.colunas_termos[(f['var'], f['termo'])] for f in filhos]))
+            else:
+                self.regras_arvore.append(i)
+
+        largura = max((len(c) for _, c in conjuncoes), default=0)
+        self.regras_conjuncao = np.array([i for i, _ in conjuncoes], dtype=int)
+        self.indices_conjuncao = np.full((len(conjuncoes), largura), coluna_uns, dtype=int)
+        for linha, (_, colunas) in enumerate(conjuncoes):
+            self.indices_conjuncao[linha, :len(colunas)] = colunas
+
+    def ativacoes(self, X):
+        """Força de disparo de cada regra (N x R)."""
+        pert = self.pertinencias(X)
+        ativ = np.empty((len(X), len(self.regras)))
+        if len(self.regras_conjuncao):
+            matriz = np.ones((len(X), len(self.colunas_termos) + 1))
+            for (var, termo), coluna in self.colunas_termos.items():
+                matriz[:, coluna] = pert[var][termo]
+            ativ[:, self.regras_conjuncao] = matriz[:, self.indices_conjuncao].min(axis=2)
+        for i in self.regras_arvore:
+            ativ[:, i] = _avaliar_antecedente(self.regras[i]['se'], pert)
+        return ativ
+
+    def _agregar(self, ativ):
+        """Conjunto de saída agregado (N x U) a partir das ativações."""
+        agregado = np.zeros((ativ.shape[0], self.mf_saida.shape[1]))
+        for t, indices in enumerate(self.regras_por_termo):
+            a, b = self.suportes[t]
+            if not indices or a == b:
+                continue
+            corte = ativ[:, indices].max(axis=1)
+            trecho = agregado[:, a:b]
+            np.maximum(trecho, np.minimum(corte[:, None], self.mf_saida[t, a:b]), out=trecho)
+        return agregado
+
+    def avaliar_lote(self, h_sin, h_cos, nuvem, temp, tamanho_lote=TAMANHO_LOTE):
+        """Avalia N amostras; retorna um array de GHI (W/m²)."""
+        X = np.column_stack(np.broadcast_arrays(h_sin, h_cos, nuvem, temp)).astype(float)
+        saida = np.empty(len(X))
+        for inicio in range(0, len(X), tamanho_lote):
+            bloco = X[inicio:inicio + tamanho_lote]
+            agregado = self._agregar(self.ativacoes(bloco))
+            saida[inicio:inicio + tamanho_lote] = _centroide(agregado, *self.pesos_centroide)
+        return saida
+
+    def descrever_regras(self):
+        """Texto 'SE ... ENTÃO ...' de cada regra, na ordem de `nomes_regras`."""
+        return [f"SE {_descrever_antecedente(r['se'])} ENTÃO {self.saida}[{r['entao']}]"
+                for r in self.regras]
+
+    def com_resolucao_saida(self, n_pontos):
+        """Cópia com o universo de saída reamostrado em `n_pontos` (mesmas regras e termos)."""
+        variaveis = dict(self.definicao['variaveis'])
+        inicio, fim, _ = variaveis[self.saida]['universo']
+        variaveis[self.saida] = dict(variaveis[self.saida], universo=[inicio, fim, n_pontos])
+        definicao = dict(self.definicao, variaveis=variaveis)
+        return ModeloMamdani(definicao, _arrays_mamdani(definicao))
+
+    def _explicar_bloco(self, bloco):
+        """
+        O centroide não é aditivo por regra; a contribuição é obtida dividindo
+        o conjunto agregado entre os termos de saída (cada ponto do universo
+        pertence ao termo que define o máximo) e atribuindo o momento de cada
+        parte à regra de maior disparo daquele termo. A soma das
+        contribuições reproduz a saída.
+        """
+        ativ = self.ativacoes(bloco)
+        agregado = self._agregar(ativ)
+        pesos_area, pesos_momento = self.pesos_centroide
+        area_total = agregado @ pesos_area
+        contribuicoes = np.zeros_like(ativ)
+        livre = np.ones(agregado.shape, dtype=bool)
+        linhas = np.arange(len(ativ))
+
+        for t, indices in enumerate(self.regras_por_termo):
+            a, b = self.suportes[t]
+            if not indices or a == b:
+                continue
+            indices = np.asarray(indices)
+            vencedora = indices[ativ[:, indices].argmax(axis=1)]
+            recorte = np.minimum(ativ[linhas, vencedora][:, None], self.mf_saida[t, a:b])
+            dominante = livre[:, a:b] & (recorte >= agregado[:, a:b]) & (recorte > 0)
+            livre[:, a:b] &= ~dominante
+            momento = np.where(dominante, agregado[:, a:b], 0.0) @ pesos_momento[a:b]
+            contribuicoes[linhas, vencedora] += np.divide(
+                momento, area_total, out=np.zeros_like(momento), where=area_total > 0
+            )
+
+        saida = np.divide(agregado @ pesos_momento, area_total,
+                          out=np.zeros_like(area_total), where=area_total > 0)
+        return ativ, contribuicoes, saida
+
+    def explicar(self, h_sin, h_cos, nuvem, temp, top_k=None, tamanho_lote=TAMANHO_LOTE):
+        """Disparo e contribuição (W/m²) de cada regra para N amostras."""
+        return _explicar(self, h_sin, h_cos, nuvem, temp, top_k, tamanho_lote)
+
+    def avaliar_com_orcamento(self, h_sin, h_cos, nuvem, temp, limite_memoria=LIMITE_MEMORIA,
+                              dtype=np.float64, medir_memoria=False):
+        """Como `avaliar_lote`, com buffers reutilizados e lote definido pela memória."""
+        return _avaliar_com_orcamento(self, h_sin, h_cos, nuvem, temp, limite_memoria, dtype, medir_memoria)
+
+    def _colunas_trabalho(self):
+        """Colunas por amostra de cada buffer de trabalho."""
+        return {
+            'X': len(ENTRADAS), 'x': 1,
+            'matriz': len(self.colunas_termos) + 1,
+            'gather': self.indices_conjuncao.size,
+            'conjuncoes': len(self.regras_conjuncao),
+            'ativ': len(self.regras),
+            'corte': 1,
+            'recorte': max(b - a for a, b in self.suportes),
+            'agregado': self.mf_saida.shape[1],
+            'area': 1, 'momento': 1, 'saida': 1,
+        }
+
+    def _colunas_temporarias(self):
+        """Temporários por amostra (float64) criados fora dos buffers."""
+        maior_termo = max((len(i) for i in self.regras_por_termo), default=0)
+        # fmin/fmax.reduce empilham os filhos: no máximo folhas + 1 colunas
+        maior_arvore = max((_contar_folhas(self.regras[i]['se']) + 1 for i in self.regras_arvore), default=0)
+        return 2 + maior_termo + maior_arvore
+
+    def _bytes_fixos(self):
+        """Temporários que não dependem do lote (inclinações do np.interp)."""
+        return 2 * 8 * max(len(self.universos[var]) for var in ENTRADAS)
+
+    def _constantes(self, dtype):
+        return {
+            'mf_saida': self.mf_saida.astype(dtype),
+            'pesos_area': self.pesos_centroide[0].astype(dtype),
+            'pesos_momento': self.pesos_centroide[1].astype(dtype),
+        }
+
+    def _avaliar_bloco_em(self, bloco, buf, cte):
+        """Mesmo cálculo de `avaliar_lote`, escrevendo apenas nos buffers `buf`."""
+        n = len(bloco)
+        matriz = buf['matriz'][:n]
+        for j, var in enumerate(ENTRADAS):
+            universo = self.universos[var]
+            x = np.clip(bloco[:, j], universo[0], universo[-1], out=buf['x'][:n, 0])
+            for termo, mf in self.mfs[var].items():
+                matriz[:, self.colunas_termos[(var, termo)]] = np.interp(x, universo, mf)
+        matriz[:, -1] = 1.0
+
+        ativ = buf['ativ'][:n]
+        if len(self.regras_conjuncao):
+            # Layout (n, V, R): o mínimo percorre linhas contíguas de R colunas
+            gather = buf['gather'][:n].reshape(n, *self.indices_conjuncao.T.shape)
+            np.take(matriz, self.indices_conjuncao.T, axis=1, out=gather, mode='clip')  # 'raise' copiaria 'out'
+            conjuncoes = buf['conjuncoes'][:n]
+            np.minimum.reduce(gather, axis=1, out=conjuncoes)
+            ativ[:, self.regras_conjuncao] = conjuncoes
+        if self.regras_arvore:
+            pert = {var: {termo: matriz[:, c] for (v, termo), c in self.colunas_termos.items() if v == var}
+                    for var in ENTRADAS}
+            for i in self.regras_arvore:
+                ativ[:, i] = _avaliar_antecedente(self.regras[i]['se'], pert)
+
+        agregado = buf['agregado'][:n]
+        agregado.fill(0.0)
+        corte = buf['corte'][:n, 0]
+        for t, indices in enumerate(self.regras_por_termo):
+            a, b = self.suportes[t]
+            if not indices or a == b:
+                continue
+            np.max(ativ[:, indices], axis=1, out=corte)
+            # Vista contígua (n x largura) do buffer, não uma fatia com passo
+            recorte = buf['recorte'].reshape(-1)[:n * (b - a)].reshape(n, b - a)
+            np.minimum(corte[:, None], cte['mf_saida'][t, a:b], out=recorte)
+            trecho = agregado[:, a:b]
+            np.maximum(trecho, recorte, out=trecho)
+
+        area = np.dot(agregado, cte['pesos_area'], out=buf['area'][:n, 0])
+        momento = np.dot(agregado, cte['pesos_momento'], out=buf['momento'][:n, 0])
+        saida = buf['saida'][:n, 0]
+        saida.fill(0.0)
+        return np.divide(momento, area, out=saida, where=area > 0)
+
+
+def _exportar_antecedente(termo):
+    """Converte um antecedente skfuzzy (Term/TermAggregate) em dicionário."""
+    if hasattr(termo, 'kind'):
+        if termo.kind == 'not':
+            raise ValueError("Antecedentes com NOT não são suportados pelo formato.")
+        chave = 'e' if termo.kind == 'and' else 'ou'
+        filhos = []
+        for filho in (termo.term1, termo.term2):
+            no = _exportar_antecedente(filho)
+            # Achata cadeias A & B & C em uma única lista
+            filhos.extend(no[chave] if chave in no else [no])
+        return {chave: filhos}
+    return {'var': termo.parent.label, 'termo': termo.label}
+
+
+def definir_mamdani(regras=None):
+    """Gera (definição, arrays) a partir do módulo ghi_mamdani."""
+    import ghi_mamdani
+
+    if regras is None:
+        regras = ghi_mamdani.regras
+    variaveis = [ghi_mamdani.hora_sin, ghi_mamdani.hora_cos, ghi_mamdani.tipo_nuvem,
+                 ghi_mamdani.temp_ar, ghi_mamdani.ghi]
+
+    definicao = {
+        'formato': FORMATO,
+        'tipo': 'mamdani',
+        'entradas': ENTRADAS,
+        'saida': ghi_mamdani.ghi.label,
+        'defuzzificacao': ghi_mamdani.ghi.defuzzify_method,
+        'variaveis': {},
+        'regras': [],
+    }
+    arrays = {}
+    for var in variaveis:
+        universo = var.universe
+        termos = {}
+        for termo, (funcao, params) in ghi_mamdani.PERTINENCIAS[var.label].items():
+            termos[termo] = {'funcao': funcao, 'params': list(params)}
+            arrays[f'mf:{var.label}:{termo}'] = var[termo].mf
+        definicao['variaveis'][var.label] = {
+            'universo': [float(universo[0]), float(universo[-1]), len(universo)],
+            'termos': termos,
+        }
+        arrays[f'universo:{var.label}'] = universo
+
+    for regra in regras:
+        consequentes = regra.consequent
+        if len(consequentes) != 1 or consequentes[0].weight != 1.0:
+            raise ValueError(f"Regra com consequente não suportado: {regra}")
+        definicao['regras'].append({
+            'se': _exportar_antecedente(regra.antecedent),
+            'entao': consequentes[0].term.label,
+        })
+    return definicao, arrays
+
+
+def _arrays_mamdani(definicao):
+    arrays = {}
+    for var, spec in definicao['variaveis'].items():
+        inicio, fim, n = spec['universo']
+        universo = np.linspace(inicio, fim, n)
+        arrays[f'universo:{var}'] = universo
+        for termo, mf in spec['termos'].items():
+            arrays[f'mf:{var}:{termo}'] = construir_mf(universo, mf['funcao'], mf['params'])
+    return arrays
+
+
+# ======================================================
+# 2. SUGENO
+# ======================================================
+
+class ModeloSugeno:
+    """Sugeno compilado: mesmas regras de ghi_sugeno, avaliadas em lote."""
+
+    tipo = 'sugeno'
+
+    def __init__(self, definicao, arrays):
+        self.definicao = definicao
+        self.limites = np.array([definicao['limites'][var] for var in ENTRADAS], dtype=float)
+        self.pertinencias_spec = definicao['pertinencias']
+        self.atenuacoes = definicao['atenuacoes']
+        self.regras = definicao['regras']
+        self.noite = definicao['noite']
+        self.limiar_ativacao = definicao['limiar_ativacao']
+        self.saida_max = definicao['saida_max']
+        # Ordem das colunas: regras na ordem da definição, depois "noite"
+        self.nomes_regras = list(self.regras) + [self.noite['regra']]
+        self.w = arrays['w']
+        self.b = arrays['b']
+
+    def _clip(self, X):
+        return np.clip(X, self.limites[:, 0], self.limites[:, 1])
+
+    def ativacoes(self, X):
+        """Força de disparo de cada regra (N x R), incluindo a coluna "noite"."""
+        X = self._clip(X)
+        colunas = {var: X[:, j] for j, var in enumerate(ENTRADAS)}
+
+        p = {}
+        for nome, spec in self.pertinencias_spec.items():
+            x = colunas[spec['entrada']]
+            p[nome] = np.exp(-0.5 * ((x - spec['media']) / spec['sigma']) ** 2)
+        for nome, (inicio, inclinacao) in self.atenuacoes.items():
+            x = colunas[self.pertinencias_spec[nome]['entrada']]
+            atenuado = np.maximum(0, p[nome] * (1 - (x - inicio) * inclinacao))
+            p[nome] = np.where(x > inicio, atenuado, p[nome])
+
+        ativ = np.zeros((len(X), len(self.nomes_regras)))
+        for i, fatores in enumerate(self.regras.values()):
+            grau = np.ones(len(X))
+            for fator in fatores:
+                grau *= np.maximum.reduce(
+                    [p[item] if isinstance(item, str) else np.full(len(X), item) for item in fator]
+                )
+            ativ[:, i] = grau
+
+        noturno = colunas[self.noite['variavel']] > self.noite['limiar']
+        ativ[noturno] = 0.0
+        ativ[noturno, -1] = 1.0
+        return ativ
+
+    def descrever_regras(self):
+        """Texto de cada regra, na ordem de `nomes_regras` (a última é a regra noturna)."""
+        def fator(itens):
+            texto = ' OU '.join(str(item) for item in itens)
+            return f'({texto})' if len(itens) > 1 else texto
+        descricoes = [f"SE {' E '.join(fator(f) for f in fatores)} ENTÃO y_{nome}"
+                      for nome, fatores in self.regras.items()]
+        descricoes.append(f"SE {self.noite['variavel']} > {self.noite['limiar']} ENTÃO y_{self.noite['regra']}")
+        return descricoes
+
+    def _explicar_bloco(self, bloco):
+        """
+        Média ponderada: a contribuição de cada regra é grau * y_regra / soma
+        dos graus. Nas amostras em que o clip final [0, saida_max] atua, as
+        contribuições são reescaladas para somar a saída recortada.
+        """
+        bloco = self._clip(bloco)
+        ativ = self.ativacoes(bloco)
+        ativ[ativ <= self.limiar_ativacao] = 0.0
+        denominador = ativ.sum(axis=1, keepdims=True)
+        contribuicoes = np.divide(ativ * (bloco @ self.w.T + self.b), denominador,
+                                  out=np.zeros_like(ativ), where=denominador > 0)
+        soma = contribuicoes.sum(axis=1)
+        saida = np.clip(soma, 0, self.saida_max)
+        recortado = saida != soma
+        if recortado.any():
+            contribuicoes[recortado] *= (saida[recortado] / soma[recortado])[:, None]
+        return ativ, contribuicoes, saida
+
+    def avaliar_lote(self, h_sin, h_cos, nuvem, temp, tamanho_lote=TAMANHO_LOTE):
+        """Avalia N amostras; retorna um array de GHI (W/m²)."""
+        X = np.column_stack(np.broadcast_arrays(h_sin, h_cos, nuvem, temp)).astype(float)
+        saida = np.empty(len(X))
+        for inicio in range(0, len(X), tamanho_lote):
+            saida[inicio:inicio + tamanho_lote] = self._explicar_bloco(X[inicio:inicio + tamanho_lote])[2]
+        return saida
+
+    def explicar(self, h_sin, h_cos, nuvem, temp, top_k=None, tamanho_lote=TAMANHO_LOTE):
+        """Disparo e contribuição (W/m²) de cada regra para N amostras."""
+        return _explicar(self, h_sin, h_cos, nuvem, temp, top_k, tamanho_lote)
+
+    def avaliar_com_orcamento(self, h_sin, h_cos, nuvem, temp, limite_memoria=LIMITE_MEMORIA,
+                              dtype=np.float64, medir_memoria=False):
+        """Como `avaliar_lote`, com buffers reutilizados e lote definido pela memória."""
+        return _avaliar_com_orcamento(self, h_sin, h_cos, nuvem, temp, limite_memoria, dtype, medir_memoria)
+
+    def _colunas_trabalho(self):
+        """Colunas por amostra de cada buffer de trabalho."""
+        n_regras = len(self.nomes_regras)
+        return {
+            'X': len(ENTRADAS), 'p': len(self.pertinencias_spec), 'fator': 1,
+            'ativ': n_regras, 'y': n_regras, 'denominador': 1, 'saida': 1,
+        }
+
+    def _colunas_temporarias(self):
+        """Temporários por amostra (float64) criados fora dos buffers."""
+        return 4 + len(self.nomes_regras) // 8 + 1
+
+    def _bytes_fixos(self):
+        return 0
+
+    def _constantes(self, dtype):
+        return {
+            'limites': self.limites.astype(dtype),
+            'wT': np.ascontiguousarray(self.w.T, dtype=dtype),
+            'b': self.b.astype(dtype),
+        }
+
+    def _avaliar_bloco_em(self, bloco, buf, cte):
+        """Mesmo cálculo de `avaliar_lote`, escrevendo apenas nos buffers `buf`."""
+        n = len(bloco)
+        X = np.clip(bloco, cte['limites'][:, 0], cte['limites'][:, 1], out=bloco)
+        colunas = {var: X[:, j] for j, var in enumerate(ENTRADAS)}
+
+        p = {}
+        for k, (nome, spec) in enumerate(self.pertinencias_spec.items()):
+            grau = buf['p'][:n, k]
+            np.subtract(colunas[spec['entrada']], spec['media'], out=grau)
+            grau /= spec['sigma']
+            np.square(grau, out=grau)
+            grau *= -0.5
+            p[nome] = np.exp(grau, out=grau)
+        for nome, (inicio, inclinacao) in self.atenuacoes.items():
+            x = colunas[self.pertinencias_spec[nome]['entrada']]
+            atenuado = np.maximum(0, p[nome] * (1 - (x - inicio) * inclinacao))
+            np.copyto(p[nome], atenuado, where=x > inicio)
+
+        ativ = buf['ativ'][:n]
+        ativ.fill(0.0)
+        fator_max = buf['fator'][:n, 0]
+        for i, fatores in enumerate(self.regras.values()):
+            grau = ativ[:, i]
+            grau.fill(1.0)
+            for fator in fatores:
+                fator_max.fill(-np.inf)
+                for item in fator:
+                    np.maximum(fator_max, p[item] if isinstance(item, str) else item, out=fator_max)
+                grau *= fator_max
+
+        noturno = colunas[self.noite['variavel']] > self.noite['limiar']
+        ativ[noturno] = 0.0
+        ativ[noturno, -1] = 1.0
+        np.multiply(ativ, ativ > self.limiar_ativacao, out=ativ)
+
+        y = np.matmul(X, cte['wT'], out=buf['y'][:n])
+        y += cte['b']
+        y *= ativ
+        denominador = np.sum(ativ, axis=1, out=buf['denominador'][:n, 0])
+        saida = np.sum(y, axis=1, out=buf['saida'][:n, 0])
+        np.divide(saida, denominador, out=saida, where=denominador > 0)
+        saida[denominador <= 0] = 0.0
+        return np.clip(saida, 0, self.saida_max, out=saida)
+
+
+def definir_sugeno():
+    """Gera (definição, arrays) a partir do módulo ghi_sugeno."""
+    import ghi_sugeno
+
+    definicao = {
+        'formato': FORMATO,
+        'tipo': 'sugeno',
+        'entradas': ENTRADAS,
+        'limites': LIMITES,
+        'pertinencias': {
+            nome: {'entrada': entrada, 'media': media, 'sigma': sigma}
+            for nome, (entrada, media, sigma) in ghi_sugeno.PERTINENCIAS.items()
+        },
+        'atenuacoes': {nome: list(v) for nome, v in ghi_sugeno.ATENUACOES.items()},
+        'regras': ghi_sugeno.REGRAS,
+        'noite': {'variavel': 'hora_cos', 'limiar': ghi_sugeno.LIMIAR_NOITE, 'regra': 'noite'},
+        'limiar_ativacao': ghi_sugeno.LIMIAR_ATIVACAO,
+        'saida_max': 1400,
+        'pesos': ghi_sugeno.PESOS,
+    }
+    return definicao, _arrays_sugeno(definicao)
+
+
+def _arrays_sugeno(definicao):
+    nomes = list(definicao['regras']) + [definicao['noite']['regra']]
+    pesos = definicao['pesos']
+    return {
+        'w': np.array([pesos[nome]['w'] for nome in nomes], dtype=float),
+        'b': np.array([pesos[nome]['b'] for nome in nomes], dtype=float),
+    }
+
+
+# ======================================================
+# 3. LOTES COM ORÇAMENTO DE MEMÓRIA
+# ======================================================
+
+def bytes_por_amostra(modelo, dtype=np.float64):
+    """Memória de trabalho por amostra: buffers no `dtype` + temporários em float64."""
+    return (sum(modelo._colunas_trabalho().values()) * np.dtype(dtype).itemsize
+            + modelo._colunas_temporarias() * 8)
+
+
+def tamanho_lote_para(modelo, limite_memoria=LIMITE_MEMORIA, dtype=np.float64):
+    """
+    Tamanho de lote cuja memória de trabalho cabe em `limite_memoria` bytes
+    (descontadas as constantes convertidas para `dtype`), limitado a
+    LOTE_CACHE bytes por lote. Levanta ValueError se o limite não comporta
+    nem uma amostra além dos custos fixos.
+    """
+    # Constantes, temporários do modelo e buffers internos dos ufuncs (até 3
+    # operandos em vistas com passo)
+    fixos = (sum(a.nbytes for a in modelo._constantes(dtype).values()) + modelo._bytes_fixos()
+             + 3 * np.getbufsize() * 8)
+    por_amostra = bytes_por_amostra(modelo, dtype)
+    if limite_memoria - fixos < por_amostra:
+        raise ValueError(f"limite_memoria de {limite_memoria} bytes abaixo do mínimo para este modelo "
+                         f"({fixos + por_amostra} bytes: {fixos} fixos + {por_amostra} por amostra)")
+    return int(min(limite_memoria - fixos, LOTE_CACHE) // por_amostra)
+
+
+def _avaliar_com_orcamento(modelo, h_sin, h_cos, nuvem, temp, limite_memoria, dtype, medir_memoria):
+    """
+    Laço comum do modo com orçamento de memória: o tamanho do lote sai de
+    `limite_memoria`, os buffers de trabalho são alocados uma vez e
+    reutilizados em todos os lotes, e o cálculo pode ser feito em float32
+    (metade da memória por amostra, o dobro do lote). A entrada (N x 4) e a
+    saída (N) ficam fora do orçamento e são sempre float64.
+
+    Em float32 a diferença para float64 fica abaixo de 0.01 W/m² nos dados de
+    teste (test_modelo_fuzzy.py; `python -m solar_fuzzy precisao` mostra os valores).
+
+    Returns:
+        (saida, estatisticas), com tamanho_lote, bytes_buffers e, se
+        `medir_memoria`, pico_bytes (pico de alocação durante a avaliação,
+        medido com tracemalloc).
+    """
+    dtype = np.dtype(dtype)
+    X = np.column_stack(np.broadcast_arrays(h_sin, h_cos, nuvem, temp)).astype(float)
+    saida = np.empty(len(X))
+    tamanho_lote = min(tamanho_lote_para(modelo, limite_memoria, dtype), max(len(X), 1))
+
+    rastreando = tracemalloc.is_tracing()
+    if medir_memoria:
+        if not rastreando:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+    buf = {nome: np.empty((tamanho_lote, colunas), dtype=dtype)
+           for nome, colunas in modelo._colunas_trabalho().items()}
+    cte = modelo._constantes(dtype)
+    for inicio in range(0, len(X), tamanho_lote):
+        fim = min(inicio + tamanho_lote, len(X))
+        bloco = buf['X'][:fim - inicio]
+        bloco[...] = X[inicio:fim]
+        saida[inicio:fim] = modelo._avaliar_bloco_em(bloco, buf, cte)
+
+    estatisticas = {
+        'tamanho_lote': tamanho_lote,
+        'bytes_buffers': sum(b.nbytes for b in buf.values()),
+        'pico_bytes': None,
+    }
+    if medir_memoria:
+        estatisticas['pico_bytes'] = tracemalloc.get_traced_memory()[1] - base
+        if not rastreando:
+            tracemalloc.stop()
+    return saida, estatisticas
+
+
+# ======================================================
+# 4. EXPORTAÇÃO / CARREGAMENTO
+# ======================================================
+
+CLASSES = {'mamdani': ModeloMamdani, 'sugeno': ModeloSugeno}
+RECONSTRUTORES = {'mamdani': _arrays_mamdani, 'sugeno': _arrays_sugeno}
+
+
+def compilar_mamdani():
+    return ModeloMamdani(*definir_mamdani())
+
+
+def compilar_sugeno():
+    return ModeloSugeno(*definir_sugeno())
+
+
+def exportar_modelo(definicao, arrays, caminho):
+    """Salva <caminho>.json e <caminho>.npz."""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(f'{caminho}.json', 'w', encoding='utf-8') as f:
+        json.dump(definicao, f, ensure_ascii=False, indent=2)
+    np.savez_compressed(f'{caminho}.npz', **arrays)
+
+
+def salvar_explicacao(caminho, explicacao, indice=None):
+    """Salva o resultado de `explicar()` em um .npz compacto (float32)."""
+    arrays = {chave: np.asarray(valor) for chave, valor in explicacao.items()}
+    if indice is not None:
+        arrays['indice'] = np.asarray(indice)
+    np.savez_compressed(caminho, **arrays)
+
+
+def carregar_modelo(caminho):
+    """
+    Carrega um modelo exportado. Se o .npz não existir, os arrays são
+    recalculados a partir dos parâmetros do .json.
+    """
+    with open(f'{caminho}.json', encoding='utf-8') as f:
+        definicao = json.load(f)
+    if definicao.get('formato') != FORMATO:
+        raise ValueError(f"Formato de modelo não suportado: {definicao.get('formato')}")
+
+    tipo = definicao['tipo']
+    if os.path.exists(f'{caminho}.npz'):
+        with np.load(f'{caminho}.npz') as npz:
+            arrays = {chave: npz[chave] for chave in npz.files}
+    else:
+        arrays = RECONSTRUTORES[tipo](definicao)
+    return CLASSES[tipo](definicao, arrays)
+
+
+if __name__ == "__main__":
+    exportar_modelo(*definir_mamdani(), f'{MODELOS_DIR}/mamdani')
+    exportar_modelo(*definir_sugeno(), f'{MODELOS_DIR}/sugeno')
+    print(f"Modelos exportados em: {MODELOS_DIR}/")
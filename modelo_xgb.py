@@ -0,0 +1,32 @@
+"""
+Localização e carregamento do modelo XGBoost de GHI (training/).
+
+O modelo treinado não acompanha todas as cópias do repositório; os scripts
+de avaliação o tratam como opcional e o omitem com um aviso.
+"""
+
+import os
+
+import joblib
+
+MODEL_PATH = 'training/xgb_model_ghi.joblib'
+FEATURES_PATH = 'training/model_features.joblib'
+
+
+def xgb_disponivel(avisar=True):
+    """True se o modelo existe; senão, avisa (se `avisar`) que será omitido."""
+    if os.path.exists(MODEL_PATH):
+        return True
+    if avisar:
+        print(f"Aviso: {MODEL_PATH} não encontrado, XGBoost será omitido.")
+    return False
+
+
+def carregar_features():
+    """Lista das features, na ordem esperada pelo modelo."""
+    return joblib.load(FEATURES_PATH)
+
+
+def carregar_xgb():
+    """(modelo, lista de features)."""
+    return joblib.load(MODEL_PATH), carregar_features()
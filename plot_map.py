@@ -6,6 +6,7 @@ import os
 # Importa os modelos para execução
 import ghi_mamdani
 import ghi_sugeno
+from modelo_fuzzy import carregar_modelo, MODELOS_DIR, ENTRADAS
 
 def garantir_pasta_predict():
     if not os.path.exists("predict"):
@@ -31,6 +32,50 @@ def calcular_z_sugeno(inputs_dict):
         temp=inputs_dict.get('temp_ar', 25)
     )
 
+def grade_superficie(modelo, x_nome, x_range, y_nome, y_range, fixos, resolucao=30):
+    """
+    Malha (X, Y, Z) avaliada em uma única chamada em lote do modelo
+    compilado (modelo_fuzzy), em vez de um compute() por ponto.
+
+    Args:
+        modelo: 'mamdani', 'sugeno' ou um modelo já carregado
+        fixos (dict): Valores das entradas que não estão nos eixos
+    """
+    if isinstance(modelo, str):
+        modelo = carregar_modelo(f'{MODELOS_DIR}/{modelo}')
+
+    x = np.linspace(x_range[0], x_range[1], resolucao)
+    y = np.linspace(y_range[0], y_range[1], resolucao)
+    X, Y = np.meshgrid(x, y)
+    entradas = dict(fixos)
+    entradas[x_nome] = X.ravel()
+    entradas[y_nome] = Y.ravel()
+    colunas = np.broadcast_arrays(*[np.asarray(entradas[v], dtype=float) for v in ENTRADAS])
+    Z = modelo.avaliar_lote(*colunas).reshape(X.shape)
+    return X, Y, Z
+
+def figura_superficie(X, Y, Z, x_nome, y_nome, titulo, figsize=(12, 8)):
+    """Monta a figura 3D de uma superfície de controle."""
+    fig = plt.figure(figsize=figsize)
+    ax = fig.add_subplot(111, projection='3d')
+    
+    # Plot da superfície com mapa de cores 'viridis' (padrão científico)
+    surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='k', lw=0.1, alpha=0.85)
+    
+    # Labels e Ajustes
+    ax.set_xlabel(x_nome, fontsize=12, labelpad=10)
+    ax.set_ylabel(y_nome, fontsize=12, labelpad=10)
+    ax.set_zlabel('GHI (W/m²)', fontsize=12, labelpad=10)
+    ax.set_title(titulo, fontsize=14, fontweight='bold')
+    
+    # Barra de cores
+    cbar = fig.colorbar(surf, shrink=0.5, aspect=10, pad=0.1)
+    cbar.set_label('Irradiação Solar (W/m²)')
+
+    # Ajuste de ângulo de visão (Elevacao, Azimute) para ver melhor a curva
+    ax.view_init(elev=30, azim=135)
+    return fig
+
 def gerar_superficie(tipo_modelo, x_nome, x_range, y_nome, y_range, fixos, titulo):
     """
     Gera e salva a superfície de controle 3D.
@@ -69,24 +114,7 @@ def gerar_superficie(tipo_modelo, x_nome, x_range, y_nome, y_range, fixos, titul
                 Z[i, j] = calcular_z_sugeno(inputs)
 
     # 3. Plotagem
-    fig = plt.figure(figsize=(12, 8))
-    ax = fig.add_subplot(111, projection='3d')
-    
-    # Plot da superfície com mapa de cores 'viridis' (padrão científico)
-    surf = ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='k', lw=0.1, alpha=0.85)
-    
-    # Labels e Ajustes
-    ax.set_xlabel(x_nome, fontsize=12, labelpad=10)
-    ax.set_ylabel(y_nome, fontsize=12, labelpad=10)
-    ax.set_zlabel('GHI (W/m²)', fontsize=12, labelpad=10)
-    ax.set_title(f"{titulo} ({tipo_modelo.capitalize()})", fontsize=14, fontweight='bold')
-    
-    # Barra de cores
-    cbar = fig.colorbar(surf, shrink=0.5, aspect=10, pad=0.1)
-    cbar.set_label('Irradiação Solar (W/m²)')
-
-    # Ajuste de ângulo de visão (Elevacao, Azimute) para ver melhor a curva
-    ax.view_init(elev=30, azim=135)
+    figura_superficie(X, Y, Z, x_nome, y_nome, f"{titulo} ({tipo_modelo.capitalize()})")
 
     # 4. Salvar
     garantir_pasta_predict()
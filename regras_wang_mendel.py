@@ -0,0 +1,220 @@
+"""
+Geração de regras Mamdani a partir dos dados (método de Wang-Mendel).
+
+Usa as partições já definidas em ghi_mamdani (zenite/alto/baixo/noite,
+manha/tarde, limpo/parcial/encoberto, conforto/quente e os termos de ghi):
+1. cada amostra gera uma regra candidata com o termo de maior pertinência
+   de cada variável;
+2. o grau da candidata é o produto dessas pertinências;
+3. candidatas com o mesmo antecedente e consequentes diferentes são
+   resolvidas pelo maior grau (Wang-Mendel clássico) ou pelo maior suporte
+   (soma dos graus).
+
+Tudo é feito com operações vetorizadas (códigos inteiros + np.maximum.at /
+np.add.at), então centenas de milhares de registros são processados em
+segundos. A base resultante pode ser salva no formato de modelo_fuzzy ou
+convertida em `ctrl.Rule` para montar um ControlSystem como `controle_ghi`.
+
+O modelo salvo registra no .json (chave 'treino') o arquivo e o recorte
+usados no aprendizado, e o nome padrão os repete (mamdani_wm_xtest70 =
+70% iniciais de X_test): avaliá-lo nesses registros mede dados de treino.
+"""
+
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modelo_fuzzy import (
+    carregar_modelo, definir_mamdani, exportar_modelo, ModeloMamdani, MODELOS_DIR, ENTRADAS,
+)
+from metricas import mae_rmse_r2, LIMIAR_DIURNO
+
+X_PATH = 'data/X_test.parquet'
+Y_PATH = 'data/y_test.parquet'
+
+
+# ======================================================
+# 1. GERAÇÃO DAS REGRAS
+# ======================================================
+
+def _termo_dominante(pertinencias_var):
+    """Índice e grau do termo de maior pertinência para cada amostra."""
+    matriz = np.column_stack(list(pertinencias_var.values()))
+    indices = matriz.argmax(axis=1)
+    return indices, matriz[np.arange(len(matriz)), indices]
+
+
+def gerar_regras(X, y, modelo_base=None, entradas=ENTRADAS, criterio='grau', suporte_minimo=0.0):
+    """
+    Aprende uma base de regras a partir de X (N x 4, ordem ENTRADAS) e y (N,).
+
+    Args:
+        modelo_base: ModeloMamdani cujas partições serão usadas (padrão:
+            modelos/mamdani).
+        entradas: subconjunto das variáveis usadas nos antecedentes.
+        criterio: 'grau' (maior grau individual) ou 'suporte' (soma dos graus).
+        suporte_minimo: descarta antecedentes com suporte total abaixo deste valor.
+
+    Returns:
+        Lista de regras no formato de modelo_fuzzy, cada uma com os campos
+        extras 'grau' e 'suporte'.
+    """
+    if modelo_base is None:
+        modelo_base = carregar_modelo(f'{MODELOS_DIR}/mamdani')
+    if criterio not in ('grau', 'suporte'):
+        raise ValueError(f"Critério desconhecido: {criterio}")
+
+    X = np.asarray(X, dtype=float)
+    pert = modelo_base.pertinencias(X)
+
+    # Antecedente codificado como um inteiro (base mista: nº de termos por variável)
+    codigo = np.zeros(len(X), dtype=np.int64)
+    grau = np.ones(len(X))
+    termos_por_var = []
+    for var in entradas:
+        termos = list(pert[var])
+        indices, graus = _termo_dominante(pert[var])
+        codigo = codigo * len(termos) + indices
+        grau *= graus
+        termos_por_var.append(termos)
+
+    # Consequente: termo de saída de maior pertinência
+    universo = modelo_base.universos[modelo_base.saida]
+    y = np.clip(np.asarray(y, dtype=float), universo[0], universo[-1])
+    pert_saida = {t: np.interp(y, universo, mf)
+                  for t, mf in zip(modelo_base.termos_saida, modelo_base.mf_saida)}
+    consequente, graus_saida = _termo_dominante(pert_saida)
+    grau *= graus_saida
+
+    # Resolução de conflitos por antecedente
+    antecedentes, codigo_compacto = np.unique(codigo, return_inverse=True)
+    n_saida = len(modelo_base.termos_saida)
+    melhor_grau = np.zeros((len(antecedentes), n_saida))
+    suporte = np.zeros((len(antecedentes), n_saida))
+    np.maximum.at(melhor_grau, (codigo_compacto, consequente), grau)
+    np.add.at(suporte, (codigo_compacto, consequente), grau)
+
+    escolha = (melhor_grau if criterio == 'grau' else suporte).argmax(axis=1)
+    suporte_total = suporte.sum(axis=1)
+
+    regras = []
+    for i in np.flatnonzero(suporte_total > suporte_minimo):
+        resto = int(antecedentes[i])
+        termos_regra = []
+        for var, termos in zip(reversed(entradas), reversed(termos_por_var)):
+            resto, indice = divmod(resto, len(termos))
+            termos_regra.append({'var': var, 'termo': termos[indice]})
+        regras.append({
+            'se': {'e': termos_regra[::-1]},
+            'entao': modelo_base.termos_saida[escolha[i]],
+            'grau': float(melhor_grau[i, escolha[i]]),
+            'suporte': float(suporte[i, escolha[i]]),
+        })
+    return regras
+
+
+# ======================================================
+# 2. INTEGRAÇÃO COM OS MODELOS
+# ======================================================
+
+def modelo_com_regras(regras, modelo_base=None):
+    """ModeloMamdani compilado com as partições de `modelo_base` e as novas regras."""
+    if modelo_base is None:
+        modelo_base = carregar_modelo(f'{MODELOS_DIR}/mamdani')
+    definicao = dict(modelo_base.definicao, regras=regras)
+    arrays = {f'universo:{v}': u for v, u in modelo_base.universos.items()}
+    for var, termos in modelo_base.mfs.items():
+        for termo, mf in termos.items():
+            arrays[f'mf:{var}:{termo}'] = mf
+    return ModeloMamdani(definicao, arrays)
+
+
+def regras_skfuzzy(regras):
+    """Converte as regras em `ctrl.Rule` sobre as variáveis de ghi_mamdani."""
+    from functools import reduce
+    from skfuzzy import control as ctrl
+    import ghi_mamdani
+
+    variaveis = {v.label: v for v in (ghi_mamdani.hora_sin, ghi_mamdani.hora_cos,
+                                      ghi_mamdani.tipo_nuvem, ghi_mamdani.temp_ar)}
+
+    def antecedente(no):
+        if 'e' in no:
+            return reduce(lambda a, b: a & b, [antecedente(f) for f in no['e']])
+        if 'ou' in no:
+            return reduce(lambda a, b: a | b, [antecedente(f) for f in no['ou']])
+        return variaveis[no['var']][no['termo']]
+
+    return [ctrl.Rule(antecedente(r['se']), ghi_mamdani.ghi[r['entao']]) for r in regras]
+
+
+def construir_controle(regras):
+    """ControlSystem equivalente a `controle_ghi`, com a base aprendida."""
+    from skfuzzy import control as ctrl
+    return ctrl.ControlSystem(regras_skfuzzy(regras))
+
+
+# ======================================================
+# 3. EXECUÇÃO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera regras Mamdani por Wang-Mendel.")
+    parser.add_argument('--x', default=X_PATH, help="Parquet com as entradas")
+    parser.add_argument('--y', default=Y_PATH, help="Parquet com a coluna 'ghi'")
+    parser.add_argument('--fracao-treino', type=float, default=0.7,
+                        help="Fração inicial (em ordem temporal) usada para aprender as regras")
+    parser.add_argument('--criterio', choices=['grau', 'suporte'], default='grau')
+    parser.add_argument('--suporte-minimo', type=float, default=0.0)
+    parser.add_argument('--destino', help="Caminho do modelo, sem extensão "
+                        "(padrão: modelos/mamdani_wm_<arquivo X><percentual de treino>)")
+    args = parser.parse_args()
+    if args.destino is None:
+        base = os.path.splitext(os.path.basename(args.x))[0].replace('_', '').lower()
+        args.destino = f'{MODELOS_DIR}/mamdani_wm_{base}{round(100 * args.fracao_treino)}'
+
+    # X e y são alinhados por linha (há timestamps repetidos entre estações)
+    X = pd.read_parquet(args.x, columns=ENTRADAS)
+    y = pd.read_parquet(args.y, columns=['ghi'])
+    ordem = np.argsort(X.index.values, kind='stable')
+    X = X.to_numpy()[ordem]
+    y = y['ghi'].to_numpy()[ordem]
+    corte = int(len(X) * args.fracao_treino)
+
+    inicio = time.perf_counter()
+    regras = gerar_regras(X[:corte], y[:corte], criterio=args.criterio,
+                          suporte_minimo=args.suporte_minimo)
+    print(f"{len(regras)} regras geradas a partir de {corte} registros em {time.perf_counter() - inicio:.2f}s")
+
+    definicao, arrays = definir_mamdani()
+    definicao['regras'] = regras
+    definicao['treino'] = {
+        'x': args.x,
+        'y': args.y,
+        'ordem': 'temporal (argsort estável do índice)',
+        'fracao': args.fracao_treino,
+        'registros': corte,
+        'criterio': args.criterio,
+        'suporte_minimo': args.suporte_minimo,
+    }
+    exportar_modelo(definicao, arrays, args.destino)
+    print(f"Modelo salvo em: {args.destino}.json/.npz")
+
+    X_val = X[corte:]
+    y_val = y[corte:]
+    diurno = y_val > LIMIAR_DIURNO
+    for nome, modelo in [('Mamdani (manual)', carregar_modelo(f'{MODELOS_DIR}/mamdani')),
+                         ('Mamdani (Wang-Mendel)', carregar_modelo(args.destino))]:
+        inicio = time.perf_counter()
+        pred = modelo.avaliar_lote(*X_val.T)
+        duracao = time.perf_counter() - inicio
+        mae, rmse, r2 = mae_rmse_r2(y_val[diurno], pred[diurno])
+        print(f"--- {nome}: {len(modelo.regras)} regras, {len(X_val) / duracao:.0f} amostras/s ---\n"
+              f"MAE:  {mae:.2f} W/m²\nRMSE: {rmse:.2f} W/m²\nR²:   {r2:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Relatório precisão x latência das formas de avaliar GHI.
+
+Varre as configurações disponíveis e mede, no mesmo recorte de validação de
+data/X_test.parquet (30% finais em ordem temporal, como em
+regras_wang_mendel.py), MAE/RMSE/R² diurnos contra latência (uma amostra por
+chamada) e vazão (lote inteiro):
+- Mamdani do skfuzzy (avaliar_ghi_mamdani, sem o cache de entradas do
+  simulador) e Sugeno escalar (avaliar_ghi_sugeno), em uma subamostra, por
+  serem avaliados ponto a ponto. A precisão deles vem de poucas amostras,
+  então ficam fora das fronteiras de Pareto;
+- Mamdani e Sugeno compilados (modelo_fuzzy), também em float32 no modo
+  com orçamento de memória;
+- resolução do universo de `ghi` do Mamdani compilado;
+- poda de regras do Mamdani (regras com fração do disparo total nos 70%
+  iniciais abaixo de um limiar) e bases Wang-Mendel com suporte mínimo;
+- XGBoost, se training/xgb_model_ghi.joblib existir.
+
+A latência é medida em linhas dos 70% iniciais, nunca avaliadas antes pelo
+mesmo motor.
+
+Saídas: predict/pareto_precisao_latencia.csv (com as fronteiras de Pareto
+MAE x vazão e MAE x latência) e predict/pareto_precisao_latencia.png.
+"""
+
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modelo_fuzzy import carregar_modelo, MODELOS_DIR, ENTRADAS
+from modelo_xgb import xgb_disponivel, carregar_xgb, carregar_features, FEATURES_PATH
+from regras_wang_mendel import gerar_regras, modelo_com_regras
+from metricas import mae_rmse_r2, LIMIAR_DIURNO
+import graficos
+
+OUTPUT_DIR = 'predict'
+RESULTADO_PATH = f'{OUTPUT_DIR}/pareto_precisao_latencia.csv'
+GRAFICO_PATH = f'{OUTPUT_DIR}/pareto_precisao_latencia.png'
+X_TEST_PATH = 'data/X_test.parquet'
+Y_TEST_PATH = 'data/y_test.parquet'
+
+RESOLUCOES_GHI = [1200, 600, 300, 150, 75]
+LIMIARES_PODA = [0.01, 0.03, 0.05]
+SUPORTES_WM = [0.0, 1.0, 10.0]
+
+
+# ======================================================
+# 1. CONFIGURAÇÕES
+# ======================================================
+
+def podar_regras(modelo, X, limiar):
+    """Remove as regras cuja fração do disparo total em X fica abaixo de `limiar`."""
+    disparo = modelo.ativacoes(X).sum(axis=0)
+    fracao = disparo / disparo.sum()
+    regras = [r for r, f in zip(modelo.regras, fracao) if f >= limiar]
+    return modelo_com_regras(regras, modelo)
+
+
+def _lote(modelo):
+    return lambda X: modelo.avaliar_lote(*X[:, :len(ENTRADAS)].T)
+
+
+def configuracoes(X_treino, y_treino, resolucoes=RESOLUCOES_GHI, limiares_poda=LIMIARES_PODA,
+                  suportes_wm=SUPORTES_WM):
+    """
+    Lista de configurações: dicts com motor, configuracao, n_regras,
+    escalar (avaliada ponto a ponto) e avaliar (X -> predições).
+    X tem as ENTRADAS nas 4 primeiras colunas e as features do XGBoost depois.
+    """
+    from skfuzzy import control as ctrl
+    from ghi_mamdani import avaliar_ghi_mamdani, controle_ghi
+    from ghi_sugeno import avaliar_ghi_sugeno
+
+    # Sem cache: o simulador padrão memoriza entradas repetidas, o que mediria
+    # acertos de cache em vez de inferências
+    simulador = ctrl.ControlSystemSimulation(controle_ghi, cache=False)
+
+    mamdani = carregar_modelo(f'{MODELOS_DIR}/mamdani')
+    sugeno = carregar_modelo(f'{MODELOS_DIR}/sugeno')
+    n_mamdani, n_sugeno = len(mamdani.regras), len(sugeno.nomes_regras)
+
+    lista = [
+        dict(motor='Mamdani (skfuzzy)', configuracao='original', n_regras=len(list(controle_ghi.rules)),
+             escalar=True, avaliar=lambda X: np.array([avaliar_ghi_mamdani(*x[:4], simulador) for x in X])),
+        dict(motor='Sugeno (escalar)', configuracao='original', n_regras=n_sugeno,
+             escalar=True, avaliar=lambda X: np.array([avaliar_ghi_sugeno(*x[:4]) for x in X])),
+        dict(motor='Sugeno', configuracao='compilado', n_regras=n_sugeno, escalar=False, avaliar=_lote(sugeno)),
+        dict(motor='Sugeno', configuracao='float32', n_regras=n_sugeno, escalar=False,
+             avaliar=lambda X: sugeno.avaliar_com_orcamento(*X[:, :4].T, dtype=np.float32)[0]),
+        dict(motor='Mamdani', configuracao='float32', n_regras=n_mamdani, escalar=False,
+             avaliar=lambda X: mamdani.avaliar_com_orcamento(*X[:, :4].T, dtype=np.float32)[0]),
+    ]
+    for n_pontos in resolucoes:
+        modelo = mamdani.com_resolucao_saida(n_pontos)
+        lista.append(dict(motor='Mamdani', configuracao=f'universo ghi={n_pontos}',
+                          n_regras=n_mamdani, escalar=False, avaliar=_lote(modelo)))
+    for limiar in limiares_poda:
+        modelo = podar_regras(mamdani, X_treino[:, :4], limiar)
+        lista.append(dict(motor='Mamdani', configuracao=f'poda fração<{limiar:g}',
+                          n_regras=len(modelo.regras), escalar=False, avaliar=_lote(modelo)))
+    for suporte in suportes_wm:
+        regras = gerar_regras(X_treino[:, :4], y_treino, mamdani, suporte_minimo=suporte)
+        modelo = modelo_com_regras(regras, mamdani)
+        lista.append(dict(motor='Mamdani (Wang-Mendel)', configuracao=f'suporte>{suporte:g}',
+                          n_regras=len(regras), escalar=False, avaliar=_lote(modelo)))
+
+    if xgb_disponivel():
+        model_ghi, features = carregar_xgb()
+        lista.append(dict(motor='XGBoost', configuracao='original', n_regras=np.nan, escalar=False,
+                          avaliar=lambda X: model_ghi.predict(pd.DataFrame(X[:, 4:], columns=features))))
+    return lista
+
+
+# ======================================================
+# 2. MEDIÇÃO
+# ======================================================
+
+def medir(config, X, y, X_latencia, repeticoes=3):
+    """
+    Precisão diurna e vazão (melhor de `repeticoes` avaliações de X inteiro)
+    e latência (mediana de chamadas com uma amostra de `X_latencia`, linhas
+    distintas das de X).
+    """
+    avaliar = config['avaliar']
+    avaliar(X[:8])  # aquecimento (imports, caches)
+
+    melhor = np.inf
+    for _ in range(1 if config['escalar'] else repeticoes):
+        inicio = time.perf_counter()
+        pred = np.asarray(avaliar(X), dtype=float)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    tempos = []
+    for x in X_latencia:
+        inicio = time.perf_counter()
+        avaliar(x[None])
+        tempos.append(time.perf_counter() - inicio)
+
+    diurno = y > LIMIAR_DIURNO
+    mae, rmse, r2 = mae_rmse_r2(y[diurno], pred[diurno])
+    return {
+        'motor': config['motor'],
+        'configuracao': config['configuracao'],
+        'n_regras': config['n_regras'],
+        'subamostra': config['escalar'],
+        'N': int(diurno.sum()),
+        'MAE': mae,
+        'RMSE': rmse,
+        'R2': r2,
+        'latencia_ms': 1000 * np.median(tempos),
+        'us_por_amostra': 1e6 * melhor / len(X),
+        'amostras_por_s': len(X) / melhor,
+    }
+
+
+def fronteira_pareto(custo, erro, elegivel=None):
+    """
+    True para os pontos não dominados (menor custo e menor erro) entre os
+    `elegivel` (padrão: todos); os demais ficam False.
+    """
+    custo, erro = np.asarray(custo), np.asarray(erro)
+    elegivel = np.ones(len(custo), dtype=bool) if elegivel is None else np.asarray(elegivel)
+    ordem = [i for i in np.lexsort((erro, custo)) if elegivel[i]]
+    na_fronteira = np.zeros(len(custo), dtype=bool)
+    melhor_erro = np.inf
+    for i in ordem:
+        if erro[i] < melhor_erro:
+            na_fronteira[i] = True
+            melhor_erro = erro[i]
+    return na_fronteira
+
+
+# ======================================================
+# 3. EXECUÇÃO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório precisão x latência (fronteira de Pareto).")
+    parser.add_argument('--fracao-treino', type=float, default=0.7,
+                        help="Fração inicial (ordem temporal) usada para poda e Wang-Mendel")
+    parser.add_argument('--amostras-escalar', type=int, default=300,
+                        help="Subamostra da validação para os motores ponto a ponto (0 = toda)")
+    parser.add_argument('--latencia', type=int, default=200,
+                        help="Chamadas unitárias por configuração (linhas dos 70%% iniciais)")
+    parser.add_argument('--resolucoes', type=int, nargs='+', default=RESOLUCOES_GHI)
+    parser.add_argument('--sem-grafico', action='store_true')
+    args = parser.parse_args()
+
+    colunas = list(ENTRADAS)
+    if os.path.exists(FEATURES_PATH):
+        colunas += list(carregar_features())
+    X = pd.read_parquet(X_TEST_PATH)
+    y = pd.read_parquet(Y_TEST_PATH, columns=['ghi'])
+    ordem = np.argsort(X.index.values, kind='stable')
+    X = X[colunas].to_numpy(dtype=float)[ordem]
+    y = y['ghi'].to_numpy()[ordem]
+    corte = int(len(X) * args.fracao_treino)
+    X_val, y_val = X[corte:], y[corte:]
+
+    # Subamostra fixa para os motores ponto a ponto
+    rng = np.random.default_rng(0)
+    n_sub = args.amostras_escalar if 0 < args.amostras_escalar < len(X_val) else len(X_val)
+    sub = np.sort(rng.choice(len(X_val), size=n_sub, replace=False))
+    # Latência em linhas que nenhum motor avalia na vazão
+    X_latencia = X[rng.choice(corte, size=min(args.latencia, corte), replace=False)]
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    linhas = []
+    for config in configuracoes(X[:corte], y[:corte], resolucoes=args.resolucoes):
+        Xc, yc = (X_val[sub], y_val[sub]) if config['escalar'] else (X_val, y_val)
+        inicio = time.perf_counter()
+        linhas.append(medir(config, Xc, yc, X_latencia))
+        print(f"{config['motor']:22s} {config['configuracao']:22s} {time.perf_counter() - inicio:6.1f}s")
+
+    tabela = pd.DataFrame(linhas)
+    # Precisão de subamostra não é comparável à da validação inteira
+    completa = ~tabela['subamostra']
+    tabela['pareto_vazao'] = fronteira_pareto(tabela['us_por_amostra'], tabela['MAE'], completa)
+    tabela['pareto_latencia'] = fronteira_pareto(tabela['latencia_ms'], tabela['MAE'], completa)
+    tabela = tabela.sort_values('us_por_amostra', ignore_index=True)
+    tabela.to_csv(RESULTADO_PATH, index=False)
+    print(tabela.drop(columns=['N']).to_string(index=False, float_format=lambda v: f"{v:.3g}"))
+    print(f"Tabela salva em: {RESULTADO_PATH}")
+
+    if not args.sem_grafico:
+        graficos.pareto(GRAFICO_PATH, tabela)
+        print(f"Gráfico salvo em: {GRAFICO_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Análise de sensibilidade global (índices de Sobol) dos modelos de GHI.
+
+Substitui a inspeção visual das superfícies de plot_map.py (que fixam duas
+entradas) por índices que consideram todas as entradas variando juntas:
+- amostragem quasi-aleatória de Sobol no esquema de Saltelli, sobre as
+  faixas dos np.clip dos modelos (modelo_fuzzy.LIMITES);
+- avaliação em grandes lotes, opcionalmente em paralelo;
+- índices de primeira ordem (Saltelli 2010) e totais (Jansen), com
+  intervalos de confiança por bootstrap vetorizado.
+"""
+
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from modelo_fuzzy import carregar_modelo, MODELOS_DIR, ENTRADAS, LIMITES
+from modelo_xgb import xgb_disponivel, carregar_xgb
+
+OUTPUT_DIR = 'predict'
+RESULTADO_PATH = f'{OUTPUT_DIR}/sensibilidade_sobol.csv'
+X_TEST_PATH = 'data/X_test.parquet'
+
+MOTORES = ['mamdani', 'sugeno', 'xgboost']
+
+
+# ======================================================
+# 1. AMOSTRAGEM (SALTELLI)
+# ======================================================
+
+def amostras_saltelli(n, limites=LIMITES, semente=0):
+    """
+    Gera as matrizes A, B (n x k) e AB (k x n x k), onde AB[i] é A com a
+    coluna i trocada pela de B. `n` deve ser potência de 2 (sequência de Sobol).
+    """
+    if n < 1 or n & (n - 1):
+        raise ValueError(f"n deve ser potência de 2 (sequência de Sobol), recebido {n}")
+    k = len(ENTRADAS)
+    base = qmc.Sobol(d=2 * k, scramble=True, seed=semente).random(n)
+    inferior = np.array([limites[v][0] for v in ENTRADAS], dtype=float)
+    superior = np.array([limites[v][1] for v in ENTRADAS], dtype=float)
+    A = qmc.scale(base[:, :k], inferior, superior)
+    B = qmc.scale(base[:, k:], inferior, superior)
+    AB = np.repeat(A[None], k, axis=0)
+    for i in range(k):
+        AB[i, :, i] = B[:, i]
+    return A, B, AB
+
+
+# ======================================================
+# 2. AVALIAÇÃO EM LOTE
+# ======================================================
+
+def medianas_xgb():
+    """Medianas das features do XGBoost no conjunto de teste (valores fixos da análise)."""
+    _, features = carregar_xgb()
+    return pd.read_parquet(X_TEST_PATH, columns=features).median()
+
+
+def criar_avaliador(motor, medianas=None):
+    """
+    Função X (N x 4) -> predições de um motor, com o modelo carregado uma vez.
+    No XGBoost, as 4 entradas fuzzy variam e as demais features ficam fixas
+    em `medianas` (padrão: medianas_xgb()).
+    """
+    if motor in ('mamdani', 'sugeno'):
+        modelo = carregar_modelo(f'{MODELOS_DIR}/{motor}')
+        return lambda X: modelo.avaliar_lote(*X.T)
+
+    model_ghi, features = carregar_xgb()
+    base = (medianas_xgb() if medianas is None else medianas)[features].to_numpy()
+
+    def avaliar(X):
+        matriz = pd.DataFrame(np.repeat(base[None], len(X), axis=0), columns=features)
+        matriz[ENTRADAS] = X
+        return model_ghi.predict(matriz)
+    return avaliar
+
+
+# Avaliador do processo worker, criado uma vez pelo initializer do pool
+_avaliador = None
+
+
+def _iniciar_worker(motor, medianas):
+    global _avaliador
+    _avaliador = criar_avaliador(motor, medianas)
+
+
+def _avaliar_bloco(X):
+    return _avaliador(X)
+
+
+def avaliar_em_lotes(motor, X, tamanho_lote=65536, workers=1):
+    """
+    Avalia X em blocos de até `tamanho_lote`, em série ou em um pool de
+    processos. Em paralelo, os blocos são reduzidos para que cada worker
+    receba ao menos um; modelos e medianas são carregados uma vez por processo.
+    """
+    medianas = medianas_xgb() if motor == 'xgboost' else None
+    if workers == 1:
+        avaliar = criar_avaliador(motor, medianas)
+        return np.concatenate([avaliar(X[i:i + tamanho_lote]) for i in range(0, len(X), tamanho_lote)])
+
+    tamanho = max(1, min(tamanho_lote, -(-len(X) // workers)))
+    blocos = [X[i:i + tamanho] for i in range(0, len(X), tamanho)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                             initargs=(motor, medianas)) as pool:
+        return np.concatenate(list(pool.map(_avaliar_bloco, blocos)))
+
+
+# ======================================================
+# 3. ÍNDICES E BOOTSTRAP
+# ======================================================
+
+def _indices(fA, fB, fAB):
+    """
+    Estimadores de S1 e ST sobre o último eixo. fA/fB: (..., n);
+    fAB: (k, ..., n). Retorna (S1, ST) com forma (k, ...).
+    """
+    variancia = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)
+    variancia = np.where(variancia > 0, variancia, np.nan)
+    s1 = np.mean(fB * (fAB - fA), axis=-1) / variancia
+    st = 0.5 * np.mean((fA - fAB) ** 2, axis=-1) / variancia
+    return s1, st
+
+
+def indices_sobol(fA, fB, fAB, n_bootstrap=1000, confianca=0.95, semente=0, bloco_bootstrap=100):
+    """
+    Índices de primeira ordem e totais com IC por bootstrap. As reamostragens
+    são feitas por indexação (bloco_bootstrap x n) de cada vez, limitando a
+    memória a k x bloco_bootstrap x n.
+    """
+    s1, st = _indices(fA, fB, fAB)
+
+    rng = np.random.default_rng(semente)
+    s1_boot = np.empty((len(ENTRADAS), n_bootstrap))
+    st_boot = np.empty((len(ENTRADAS), n_bootstrap))
+    for inicio in range(0, n_bootstrap, bloco_bootstrap):
+        fim = min(inicio + bloco_bootstrap, n_bootstrap)
+        idx = rng.integers(0, len(fA), size=(fim - inicio, len(fA)))
+        s1_boot[:, inicio:fim], st_boot[:, inicio:fim] = _indices(fA[idx], fB[idx], fAB[:, idx])
+
+    alfa = (1 - confianca) / 2
+    quantis = [alfa, 1 - alfa]
+    s1_ic = np.nanquantile(s1_boot, quantis, axis=1)
+    st_ic = np.nanquantile(st_boot, quantis, axis=1)
+
+    return pd.DataFrame({
+        'entrada': ENTRADAS,
+        'S1': s1,
+        'S1_ic_inf': s1_ic[0],
+        'S1_ic_sup': s1_ic[1],
+        'ST': st,
+        'ST_ic_inf': st_ic[0],
+        'ST_ic_sup': st_ic[1],
+    })
+
+
+def analisar(motor, n=8192, n_bootstrap=1000, tamanho_lote=65536, workers=1, semente=0):
+    """Executa a análise completa para um motor; n*(k+2) avaliações."""
+    A, B, AB = amostras_saltelli(n, semente=semente)
+    k = len(ENTRADAS)
+    X = np.concatenate([A, B, AB.reshape(k * n, k)])
+    y = avaliar_em_lotes(motor, X, tamanho_lote=tamanho_lote, workers=workers)
+
+    fA, fB, fAB = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+    resultado = indices_sobol(fA, fB, fAB, n_bootstrap=n_bootstrap, semente=semente)
+    resultado.insert(0, 'modelo', motor)
+    return resultado
+
+
+# ======================================================
+# 4. EXECUÇÃO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Índices de Sobol para Mamdani, Sugeno e XGBoost.")
+    parser.add_argument('--n', type=int, default=8192, help="Amostras base (potência de 2)")
+    parser.add_argument('--bootstrap', type=int, default=1000, help="Reamostragens para os ICs")
+    parser.add_argument('--lote', type=int, default=65536, help="Tamanho do lote de avaliação")
+    parser.add_argument('--workers', type=int, default=1, help="Processos para a avaliação")
+    parser.add_argument('--modelos', nargs='+', default=MOTORES, choices=MOTORES)
+    args = parser.parse_args()
+    if args.n < 1 or args.n & (args.n - 1):
+        parser.error(f"--n deve ser potência de 2 (sequência de Sobol), recebido {args.n}")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    resultados = []
+    for motor in args.modelos:
+        if motor == 'xgboost' and not xgb_disponivel():
+            continue
+        inicio = time.perf_counter()
+        resultados.append(analisar(motor, args.n, args.bootstrap, args.lote, args.workers))
+        n_avaliacoes = args.n * (len(ENTRADAS) + 2)
+        print(f"{motor}: {n_avaliacoes} avaliações em {time.perf_counter() - inicio:.1f}s")
+
+    tabela = pd.concat(resultados, ignore_index=True)
+    tabela.to_csv(RESULTADO_PATH, index=False)
+    print(tabela.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"Resultados salvos em: {RESULTADO_PATH}")
+
+
+if __name__ == "__main__":
+    main()
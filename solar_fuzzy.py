@@ -0,0 +1,390 @@
+"""
+Ponto de entrada de linha de comando para pontuação em lote.
+
+Uso:
+    python -m solar_fuzzy score entrada.parquet saida.parquet \\
+        --engine mamdani|sugeno|xgb|all --workers N --batch-size B \\
+        [--limite-memoria MB] [--float32]
+    python -m solar_fuzzy precisao entrada.parquet [--limite-memoria MB]
+    python -m solar_fuzzy ingest bruto.csv features.parquet [--solar] [--hora solar]
+
+Lê apenas as colunas exigidas pelos motores selecionados, avalia o arquivo
+em lotes (em série ou em um pool de processos), grava um parquet com as
+predições e imprime estatísticas de vazão, sem os gráficos e relatórios de
+evaluate-fuzzy.py. Novos motores são adicionados com `@registrar_motor`.
+
+Com --limite-memoria/--float32 os motores fuzzy usam o modo com orçamento
+de memória de modelo_fuzzy (`avaliar_com_orcamento`); `precisao` mede a
+diferença float32 vs float64 e o pico de memória desse modo.
+"""
+
+import os
+import sys
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from modelo_fuzzy import carregar_modelo, tamanho_lote_para, MODELOS_DIR, ENTRADAS, LIMITE_MEMORIA
+from modelo_xgb import xgb_disponivel, carregar_xgb, carregar_features, MODEL_PATH
+from dados_compartilhados import BufferCompartilhado
+import ingestao
+
+
+# ======================================================
+# 1. REGISTRO DE MOTORES
+# ======================================================
+
+# nome -> (função que lista as colunas exigidas, fábrica do avaliador)
+MOTORES = {}
+
+
+def registrar_motor(nome, colunas):
+    """
+    Registra um motor. `colunas` é uma lista fixa ou uma função
+    (opcoes -> lista). A fábrica recebe as opções da CLI e retorna uma
+    função que mapeia um array (N x len(colunas)) em N predições.
+    """
+    def decorador(fabrica):
+        MOTORES[nome] = (colunas if callable(colunas) else (lambda opcoes: colunas), fabrica)
+        return fabrica
+    return decorador
+
+
+def _orcamento(opcoes):
+    """(limite em bytes, dtype) do modo com orçamento de memória, ou None se não pedido."""
+    if opcoes.get('limite_memoria') is None and not opcoes.get('float32'):
+        return None
+    return opcoes.get('limite_memoria') or LIMITE_MEMORIA, np.float32 if opcoes.get('float32') else np.float64
+
+
+def _modelo_fuzzy(nome, opcoes):
+    return carregar_modelo(opcoes.get(nome, f'{MODELOS_DIR}/{nome}'))
+
+
+def _avaliador_fuzzy(modelo, opcoes):
+    """avaliar_lote, ou o modo com orçamento de memória se pedido nas opções."""
+    orcamento = _orcamento(opcoes)
+    if orcamento is None:
+        return lambda X: modelo.avaliar_lote(*X.T)
+    limite, dtype = orcamento
+    return lambda X: modelo.avaliar_com_orcamento(*X.T, limite_memoria=limite, dtype=dtype)[0]
+
+
+@registrar_motor('mamdani', ENTRADAS)
+def _motor_mamdani(opcoes):
+    return _avaliador_fuzzy(_modelo_fuzzy('mamdani', opcoes), opcoes)
+
+
+@registrar_motor('sugeno', ENTRADAS)
+def _motor_sugeno(opcoes):
+    return _avaliador_fuzzy(_modelo_fuzzy('sugeno', opcoes), opcoes)
+
+
+def verificar_orcamento(motores, opcoes):
+    """
+    Levanta ValueError se o limite de memória das opções não comporta algum
+    dos motores fuzzy selecionados (custos fixos + uma amostra).
+    """
+    orcamento = _orcamento(opcoes)
+    if orcamento is None:
+        return
+    for nome in motores:
+        if nome in ('mamdani', 'sugeno'):
+            try:
+                tamanho_lote_para(_modelo_fuzzy(nome, opcoes), *orcamento)
+            except ValueError as e:
+                raise ValueError(f"motor '{nome}': {e}") from None
+
+
+@registrar_motor('xgb', lambda opcoes: carregar_features())
+def _motor_xgb(opcoes):
+    model_ghi, features = carregar_xgb()
+    return lambda X: model_ghi.predict(pd.DataFrame(X, columns=features))
+
+
+def motor_disponivel(nome):
+    """Retorna uma mensagem de erro se o motor não puder ser usado, ou None."""
+    if nome == 'xgb' and not xgb_disponivel(avisar=False):
+        return f"{MODEL_PATH} não encontrado"
+    return None
+
+
+# ======================================================
+# 2. AVALIAÇÃO DOS LOTES
+# ======================================================
+
+_avaliadores = {}
+# Vagas de lote em memória compartilhada, no pool: {motor: (entradas, predições)}
+_vagas = {}
+
+
+def _iniciar_worker(motores, opcoes, descritores=None):
+    """
+    Carrega os motores uma vez por processo; no pool, também se anexa aos
+    buffers de vagas ({motor: (descritor das entradas, descritor da saída)}).
+    """
+    _avaliadores.clear()
+    for nome in motores:
+        _avaliadores[nome] = MOTORES[nome][1](opcoes)
+    _vagas.clear()
+    for nome, (entradas, saida) in (descritores or {}).items():
+        _vagas[nome] = (BufferCompartilhado.anexar(entradas), BufferCompartilhado.anexar(saida))
+
+
+def _avaliar_lote(entradas):
+    """entradas: {motor: array}. Retorna ({motor: predições}, {motor: segundos})."""
+    predicoes, tempos = {}, {}
+    for nome, X in entradas.items():
+        inicio = time.perf_counter()
+        predicoes[nome] = np.asarray(_avaliadores[nome](X), dtype=np.float64)
+        tempos[nome] = time.perf_counter() - inicio
+    return predicoes, tempos
+
+
+def _avaliar_vaga(vaga, n):
+    """
+    Avalia as `n` primeiras linhas da vaga `vaga` e escreve as predições no
+    buffer de saída compartilhado. Retorna {motor: segundos}.
+    """
+    tempos = {}
+    for nome, (entradas, saida) in _vagas.items():
+        inicio = time.perf_counter()
+        saida.array[vaga, :n] = _avaliadores[nome](entradas.array[vaga, :n])
+        tempos[nome] = time.perf_counter() - inicio
+    return tempos
+
+
+def _preencher(tabela, colunas, destino):
+    """Copia `colunas` da tabela arrow para `destino` (N x len(colunas))."""
+    for j, coluna in enumerate(colunas):
+        destino[:, j] = tabela.column(coluna).to_numpy()
+    return destino
+
+
+def _colunas_indice(arquivo):
+    """Colunas de índice do pandas gravadas no parquet (ex.: 'timestamp')."""
+    metadados = arquivo.schema_arrow.pandas_metadata or {}
+    return [c for c in metadados.get('index_columns', []) if isinstance(c, str)]
+
+
+def pontuar_arquivo(entrada, saida, motores, workers=1, tamanho_lote=65536, opcoes=None):
+    """
+    Pontua `entrada` com os `motores` e grava `saida`. Retorna um dicionário
+    de estatísticas (linhas, segundos totais e por motor).
+    """
+    opcoes = opcoes or {}
+    verificar_orcamento(motores, opcoes)  # antes de abrir a saída ou iniciar o pool
+    colunas_motor = {nome: list(MOTORES[nome][0](opcoes)) for nome in motores}
+    arquivo = pq.ParquetFile(entrada)
+    passagem = _colunas_indice(arquivo)
+    colunas = list(dict.fromkeys(passagem + [c for cols in colunas_motor.values() for c in cols]))
+
+    def lotes():
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=colunas):
+            yield pa.Table.from_batches([lote])
+
+    estatisticas = {'linhas': 0, 'segundos': 0.0, 'por_motor': dict.fromkeys(motores, 0.0)}
+    # Esquema definido antes do primeiro lote: uma entrada vazia ainda gera
+    # um parquet (vazio) com as colunas esperadas
+    esquema = pa.schema([arquivo.schema_arrow.field(c) for c in passagem]
+                        + [pa.field(f'ghi_{nome}', pa.float64()) for nome in motores])
+    inicio = time.perf_counter()
+
+    def gravar(meta, predicoes, tempos):
+        for nome, valores in predicoes.items():
+            meta = meta.append_column(f'ghi_{nome}', pa.array(valores))
+            estatisticas['por_motor'][nome] += tempos[nome]
+        escritor.write_table(meta.cast(esquema))
+        estatisticas['linhas'] += meta.num_rows
+
+    # Grava em <saida>.parcial e só renomeia no fim: uma falha (orçamento de
+    # memória, worker interrompido) não deixa um parquet truncado em `saida`
+    with ingestao.gravacao_atomica(saida) as temporario:
+        escritor = pq.ParquetWriter(temporario, esquema.with_metadata(arquivo.schema_arrow.metadata))
+        try:
+            if workers == 1:
+                _iniciar_worker(motores, opcoes)
+                for tabela in lotes():
+                    entradas = {nome: _preencher(tabela, cols, np.empty((tabela.num_rows, len(cols))))
+                                for nome, cols in colunas_motor.items()}
+                    gravar(tabela.select(passagem), *_avaliar_lote(entradas))
+            else:
+                _pontuar_em_pool(lotes(), colunas_motor, passagem, gravar, motores, workers,
+                                 tamanho_lote, opcoes)
+        finally:
+            escritor.close()
+
+    estatisticas['segundos'] = time.perf_counter() - inicio
+    return estatisticas
+
+
+def _pontuar_em_pool(lotes, colunas_motor, passagem, gravar, motores, workers, tamanho_lote, opcoes):
+    """
+    Avalia `lotes` em um pool com uma janela de 2 lotes em voo por worker.
+    Cada lote em voo ocupa uma vaga de buffers compartilhados (entradas e
+    predições por motor): o pai copia as colunas direto para a vaga e os
+    workers recebem só (vaga, linhas), sem serializar arrays. A ordem de
+    gravação é preservada, e uma vaga só é reutilizada depois de gravada.
+    """
+    n_vagas = 2 * workers
+    entradas, saidas = {}, {}
+    try:
+        for nome, cols in colunas_motor.items():
+            entradas[nome] = BufferCompartilhado.criar((n_vagas, tamanho_lote, len(cols)))
+            saidas[nome] = BufferCompartilhado.criar((n_vagas, tamanho_lote))
+        descritores = {nome: (entradas[nome].descritor, saidas[nome].descritor) for nome in colunas_motor}
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                                 initargs=(motores, opcoes, descritores)) as pool:
+            pendentes = []
+
+            def gravar_primeiro():
+                meta, vaga, n, futuro = pendentes.pop(0)
+                tempos = futuro.result()
+                # Cópia: o arrow não pode manter views da vaga, que será reutilizada e liberada
+                gravar(meta, {nome: saidas[nome].array[vaga, :n].copy() for nome in saidas}, tempos)
+
+            for i, tabela in enumerate(lotes):
+                vaga, n = i % n_vagas, tabela.num_rows
+                for nome, cols in colunas_motor.items():
+                    _preencher(tabela, cols, entradas[nome].array[vaga, :n])
+                pendentes.append((tabela.select(passagem), vaga, n, pool.submit(_avaliar_vaga, vaga, n)))
+                if len(pendentes) >= n_vagas:
+                    gravar_primeiro()
+            while pendentes:
+                gravar_primeiro()
+    finally:
+        for buffer in [*entradas.values(), *saidas.values()]:
+            buffer.fechar()
+
+
+def pico_rss_mb():
+    """
+    Pico de memória residente (MB) deste processo e dos workers já encerrados,
+    ou None onde o módulo `resource` não existe (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    escala = 1 if sys.platform == 'darwin' else 1024  # bytes no macOS, KB no Linux
+    return max(proprio, filhos) * escala / 2 ** 20
+
+
+# ======================================================
+# 3. PRECISÃO DO MODO REDUZIDO
+# ======================================================
+
+def comparar_precisao(X, caminhos, limite_memoria=LIMITE_MEMORIA):
+    """
+    Diferença entre float32 e float64 no modo com orçamento de memória,
+    para cada modelo fuzzy. X: (N x 4) na ordem ENTRADAS.
+
+    Returns:
+        DataFrame com modelo, dtype, tamanho_lote, pico_mb, segundos e as
+        diferenças absolutas máxima/média para float64 (W/m²).
+    """
+    linhas = []
+    for nome, caminho in caminhos.items():
+        modelo = carregar_modelo(caminho)
+        referencia = None
+        for dtype in (np.float64, np.float32):
+            inicio = time.perf_counter()
+            y, est = modelo.avaliar_com_orcamento(*X.T, limite_memoria=limite_memoria,
+                                                  dtype=dtype, medir_memoria=True)
+            segundos = time.perf_counter() - inicio
+            if referencia is None:
+                referencia = y
+            diferenca = np.abs(y - referencia)
+            linhas.append({
+                'modelo': nome, 'dtype': np.dtype(dtype).name,
+                'tamanho_lote': est['tamanho_lote'], 'pico_mb': est['pico_bytes'] / 2 ** 20,
+                'segundos': segundos, 'dif_max': diferenca.max(), 'dif_media': diferenca.mean(),
+            })
+    return pd.DataFrame(linhas)
+
+
+# ======================================================
+# 4. CLI
+# ======================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m solar_fuzzy', description="Ferramentas do projeto Solar Fuzzy.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    score = sub.add_parser('score', help="Pontua um arquivo parquet em lote")
+    score.add_argument('entrada', help="Parquet de entrada com as features")
+    score.add_argument('saida', help="Parquet de saída com as predições")
+    score.add_argument('--engine', default='all', choices=list(MOTORES) + ['all'])
+    score.add_argument('--workers', type=int, default=1)
+    score.add_argument('--batch-size', type=int, default=65536)
+    score.add_argument('--mamdani', default=f'{MODELOS_DIR}/mamdani', help="Modelo Mamdani (sem extensão)")
+    score.add_argument('--sugeno', default=f'{MODELOS_DIR}/sugeno', help="Modelo Sugeno (sem extensão)")
+    score.add_argument('--limite-memoria', type=float, default=None,
+                       help="Memória de trabalho (MB) por motor fuzzy; ativa o modo com orçamento")
+    score.add_argument('--float32', action='store_true', help="Calcula os motores fuzzy em float32")
+
+    precisao = sub.add_parser('precisao', help="Compara float32 e float64 no modo com orçamento de memória")
+    precisao.add_argument('entrada', help="Parquet de entrada com as features")
+    precisao.add_argument('--limite-memoria', type=float, default=LIMITE_MEMORIA / 2 ** 20, help="MB")
+    precisao.add_argument('--mamdani', default=f'{MODELOS_DIR}/mamdani', help="Modelo Mamdani (sem extensão)")
+    precisao.add_argument('--sugeno', default=f'{MODELOS_DIR}/sugeno', help="Modelo Sugeno (sem extensão)")
+
+    ingest = sub.add_parser('ingest', help="Deriva as entradas dos modelos a partir de observações brutas")
+    ingestao.adicionar_argumentos(ingest)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'ingest':
+        ingestao.executar(args)
+        return
+
+    if args.comando == 'precisao':
+        X = pd.read_parquet(args.entrada, columns=ENTRADAS).to_numpy(dtype=float)
+        tabela = comparar_precisao(X, {'mamdani': args.mamdani, 'sugeno': args.sugeno},
+                                   int(args.limite_memoria * 2 ** 20))
+        print(f"{len(X)} linhas, limite de {args.limite_memoria:g} MB por motor")
+        print(tabela.to_string(index=False, float_format=lambda v: f"{v:.3g}"))
+        return
+
+    if args.engine == 'all':
+        motores = []
+        for nome in MOTORES:
+            erro = motor_disponivel(nome)
+            if erro:
+                print(f"Aviso: motor '{nome}' omitido ({erro}).", file=sys.stderr)
+            else:
+                motores.append(nome)
+    else:
+        erro = motor_disponivel(args.engine)
+        if erro:
+            parser.error(f"motor '{args.engine}' indisponível: {erro}")
+        motores = [args.engine]
+
+    opcoes = {
+        'mamdani': args.mamdani, 'sugeno': args.sugeno, 'float32': args.float32,
+        'limite_memoria': None if args.limite_memoria is None else int(args.limite_memoria * 2 ** 20),
+    }
+    try:
+        verificar_orcamento(motores, opcoes)
+    except ValueError as e:
+        parser.error(f"--limite-memoria insuficiente: {e}")
+    est = pontuar_arquivo(args.entrada, args.saida, motores, args.workers, args.batch_size, opcoes)
+
+    print(f"{est['linhas']} linhas em {est['segundos']:.2f}s "
+          f"({est['linhas'] / max(est['segundos'], 1e-9):.0f} linhas/s) -> {args.saida}")
+    for nome, segundos in est['por_motor'].items():
+        print(f"  {nome:8s} {segundos:.2f}s no motor ({est['linhas'] / max(segundos, 1e-9):.0f} linhas/s)")
+    pico = pico_rss_mb()
+    if pico is not None:
+        print(f"Pico de memória residente: {pico:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
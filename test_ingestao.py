@@ -0,0 +1,84 @@
+"""
+Testes da ingestão de observações brutas (ingestao.ingerir): exports do
+INMET sem latitude/longitude e arquivos sem linhas.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingestao
+from ingestao import ingerir
+from modelo_fuzzy import ENTRADAS
+
+COLUNAS_SAIDA = ENTRADAS + ['dia_ano_sin', 'dia_ano_cos']
+
+
+def _bruto(horas):
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=horas, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+        'tipo_nuvem': 3.0,
+        'temp_ar': 25.0,
+    })
+
+
+def test_csv_sem_latitude_longitude(tmp_path):
+    entrada, saida = tmp_path / 'bruto.csv', tmp_path / 'saida.parquet'
+    _bruto(48).to_csv(entrada, index=False)
+
+    est = ingerir(str(entrada), str(saida))
+
+    X = pd.read_parquet(saida)
+    assert est['linhas'] == 48
+    assert list(X.columns) == COLUNAS_SAIDA
+    assert X.index.name == 'timestamp'
+    np.testing.assert_allclose(X['hora_cos'].iloc[12], -1.0)  # meio-dia
+
+
+def test_csv_sem_latitude_longitude_com_valores_fixos(tmp_path):
+    entrada, saida = tmp_path / 'bruto.csv', tmp_path / 'saida.parquet'
+    _bruto(24).to_csv(entrada, index=False)
+
+    ingerir(str(entrada), str(saida), solar=True, latitude=-5.8, longitude=-35.2)
+
+    X = pd.read_parquet(saida)
+    assert {'latitude_inmet', 'longitude_inmet', 'cos_zenite'} <= set(X.columns)
+    assert (X['latitude_inmet'] == -5.8).all()
+
+
+@pytest.mark.parametrize('formato', ['csv', 'parquet'])
+def test_entrada_vazia_gera_arquivo(tmp_path, formato):
+    entrada, saida = tmp_path / f'bruto.{formato}', tmp_path / 'saida.parquet'
+    if formato == 'csv':
+        _bruto(0).to_csv(entrada, index=False)
+    else:
+        _bruto(0).assign(timestamp=pd.DatetimeIndex([])).to_parquet(entrada)
+
+    est = ingerir(str(entrada), str(saida))
+
+    X = pd.read_parquet(saida)
+    assert est['linhas'] == 0
+    assert len(X) == 0
+    assert list(X.columns) == COLUNAS_SAIDA
+
+
+
+def test_falha_no_meio_nao_deixa_saida(tmp_path, monkeypatch):
+    entrada, saida = tmp_path / 'bruto.parquet', tmp_path / 'saida.parquet'
+    _bruto(48).assign(timestamp=lambda d: pd.to_datetime(d['timestamp'])).to_parquet(entrada)
+
+    preparar = ingestao.preparar_bloco
+    chamadas = []
+
+    def preparar_e_falhar(bloco, *args, **kwargs):
+        chamadas.append(bloco.num_rows)
+        if len(chamadas) == 2:
+            raise RuntimeError("falha no segundo bloco")
+        return preparar(bloco, *args, **kwargs)
+
+    monkeypatch.setattr(ingestao, 'preparar_bloco', preparar_e_falhar)
+    with pytest.raises(RuntimeError):
+        ingerir(str(entrada), str(saida), tamanho_bloco=24)
+
+    assert len(chamadas) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['bruto.parquet']
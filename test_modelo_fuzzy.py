@@ -0,0 +1,44 @@
+"""
+Testes do modo com orçamento de memória (modelo_fuzzy.avaliar_com_orcamento):
+perda de precisão de float32 frente a float64 nos dados de teste e respeito
+ao limite de memória.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo_fuzzy import carregar_modelo, tamanho_lote_para, MODELOS_DIR, ENTRADAS
+
+X_TEST_PATH = 'data/X_test.parquet'
+TOLERANCIA_FLOAT32 = 1e-2  # W/m²
+LIMITE_MEMORIA = 8 * 2 ** 20
+
+
+@pytest.fixture(scope='module')
+def entradas():
+    return pd.read_parquet(X_TEST_PATH, columns=ENTRADAS).to_numpy(dtype=float).T
+
+
+@pytest.mark.parametrize('nome', ['mamdani', 'sugeno'])
+def test_float32_proximo_de_float64(nome, entradas):
+    modelo = carregar_modelo(f'{MODELOS_DIR}/{nome}')
+    y64, _ = modelo.avaliar_com_orcamento(*entradas, dtype=np.float64)
+    y32, _ = modelo.avaliar_com_orcamento(*entradas, dtype=np.float32)
+    assert np.max(np.abs(y32 - y64)) <= TOLERANCIA_FLOAT32
+    np.testing.assert_allclose(y64, modelo.avaliar_lote(*entradas), atol=1e-9)
+
+
+@pytest.mark.parametrize('nome', ['mamdani', 'sugeno'])
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_pico_dentro_do_limite(nome, dtype, entradas):
+    modelo = carregar_modelo(f'{MODELOS_DIR}/{nome}')
+    _, est = modelo.avaliar_com_orcamento(*entradas, limite_memoria=LIMITE_MEMORIA, dtype=dtype,
+                                          medir_memoria=True)
+    assert est['pico_bytes'] <= LIMITE_MEMORIA
+
+
+def test_limite_abaixo_dos_custos_fixos():
+    modelo = carregar_modelo(f'{MODELOS_DIR}/mamdani')
+    with pytest.raises(ValueError):
+        tamanho_lote_para(modelo, limite_memoria=1024)